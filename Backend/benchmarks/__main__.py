@@ -0,0 +1,98 @@
+"""
+Run the endpoint benchmarks against a throwaway database.
+
+    python -m benchmarks --scale 100k --iterations 50 \
+        --output bench.json --baseline benchmarks/baseline.json
+
+Exits 1 if any scenario regresses against the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+
+import django
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", default="1k", help="Dataset size: 1k, 100k or 1m ratings")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Scenario names to run")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the response cache between requests")
+    parser.add_argument("--db", help="SQLite file for the benchmark database (default: in memory)")
+    parser.add_argument("--keepdb", action="store_true", help="Reuse --db and its dataset across runs")
+    parser.add_argument("--output", help="Write JSON results here")
+    parser.add_argument("--baseline", help="Compare against this JSON results file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fractional p95 slowdown")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Re-record the scenarios in --baseline whose queries or p95 moved")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mrp.settings")
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+
+    from benchmarks.suite import SCALES, compare, load_dataset, run_suite, uncovered_routes, update_baseline
+
+    if args.scale not in SCALES:
+        parser.error(f"--scale must be one of {', '.join(SCALES)}")
+    missing = uncovered_routes()
+    if missing:
+        parser.error(f"routes without a benchmark scenario: {', '.join(missing)}")
+
+    if args.db:
+        settings.DATABASES["default"].setdefault("TEST", {})["NAME"] = args.db
+    connection.creation.create_test_db(verbosity=0, keepdb=args.keepdb)
+    try:
+        generated = load_dataset(args.scale, seed=args.seed)
+        print(f"dataset {args.scale}: {'generated' if generated else 'reused'}", file=sys.stderr)
+        results = {
+            "scale": args.scale,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "scenarios": run_suite(args.iterations, args.warm_cache, args.only),
+        }
+    finally:
+        if not args.keepdb:
+            connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+
+    print(f"{'scenario':28} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'sql ms':>8} {'bytes':>9}")
+    for name, row in results["scenarios"].items():
+        print(f"{name:28} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f} "
+              f"{row['queries']:8d} {row['sql_ms']:8.2f} {row['bytes']:9d}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.baseline and args.update_baseline:
+        try:
+            with open(args.baseline) as fh:
+                baseline = json.load(fh)
+        except FileNotFoundError:
+            baseline = None
+        baseline, changed = update_baseline(results, baseline, args.tolerance)
+        with open(args.baseline, "w") as fh:
+            json.dump(baseline, fh, indent=2)
+        print(f"re-recorded: {', '.join(changed) or 'nothing'}", file=sys.stderr)
+        return 0
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if baseline.get("scale") != args.scale:
+            print(f"baseline is for scale {baseline.get('scale')}, skipping comparison", file=sys.stderr)
+            return 0
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
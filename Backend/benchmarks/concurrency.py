@@ -0,0 +1,88 @@
+"""
+Compare the sync (DRF, WSGI-style) and native async read paths under load.
+
+    python -m benchmarks.concurrency --scale 1k --requests 500 --concurrency 50
+
+Both paths go through Django's ASGI handler in-process with the async test
+client: sync views run on the thread-sensitive executor, async views await
+the ORM. Reports wall time and requests/second per path.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import django
+
+
+PATHS = [
+    ("movie-list", "/api/movies/?limit=20", "/api/async/movies/?limit=20"),
+    ("movie-list-genre", "/api/movies/?genre=drama&limit=20", "/api/async/movies/?genre=drama&limit=20"),
+    ("movie-ratings", "/api/movies/{movie}/ratings/?limit=20", "/api/async/movies/{movie}/ratings/?limit=20"),
+]
+
+
+async def drive(client, path, requests, concurrency):
+    from django.core.cache import cache
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await cache.aclear()  # measure the database path, not the response cache
+            response = await client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    return time.perf_counter() - started
+
+
+async def compare(requests, concurrency):
+    from django.test import AsyncClient
+
+    from movies.models import Movie
+
+    movie = await Movie.objects.order_by("-ratings_count").afirst()
+    client = AsyncClient()
+    rows = []
+    for name, sync_path, async_path in PATHS:
+        timings = {}
+        for label, path in (("sync", sync_path), ("async", async_path)):
+            timings[label] = await drive(client, path.format(movie=movie.pk), requests, concurrency)
+        rows.append((name, timings))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.concurrency")
+    parser.add_argument("--scale", default="1k")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mrp.settings")
+    django.setup()
+
+    from django.db import connection
+
+    from benchmarks.suite import load_dataset
+
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        load_dataset(args.scale)
+        rows = asyncio.run(compare(args.requests, args.concurrency))
+    finally:
+        connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'endpoint':20} {'sync s':>8} {'sync rps':>9} {'async s':>8} {'async rps':>10}")
+    for name, timings in rows:
+        print(f"{name:20} {timings['sync']:8.2f} {args.requests / timings['sync']:9.0f} "
+              f"{timings['async']:8.2f} {args.requests / timings['async']:10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
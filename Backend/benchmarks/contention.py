@@ -0,0 +1,140 @@
+"""
+Hot-movie write contention: many writer threads rating the same movie.
+
+    python -m benchmarks.contention --writers 1 4 16 --votes 50 --shards 8
+
+Each writer is its own user and keeps changing its rating, so every POST
+moves the movie's aggregates. The run is repeated with the counters on the
+Movie row (MOVIES_RATING_SHARDS=0) and spread over --shards rows, and
+reports votes/second, latency and writes to the Task queue per writer
+count. After a sharded run the queued folds are drained and the aggregates
+checked against a recount.
+
+SQLite serializes every write on the database file, so row-level sharding
+can't scale there; point DATABASES at PostgreSQL or MySQL to see the row
+lock go away.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import django
+
+
+def drive(movie_id, tokens, votes):
+    from django.db import connection
+    from django.test import Client
+
+    latencies, errors, task_writes = [], [], []
+    lock = threading.Lock()
+    start = threading.Barrier(len(tokens))
+
+    def count_task_writes(execute, sql, params, many, context):
+        # every writer that touches a movie's (name, key) Task row contends on it
+        if sql.startswith("INSERT") and '"movies_task"' in sql:
+            task_writes.append(1)
+        return execute(sql, params, many, context)
+
+    def writer(offset, token):
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        mine = []
+        try:
+            start.wait()
+            with connection.execute_wrapper(count_task_writes):
+                for vote in range(votes):
+                    began = time.perf_counter()
+                    response = client.post(
+                        f"/api/movies/{movie_id}/ratings/", {"rating": (offset + vote) % 5 + 1},
+                        content_type="application/json",
+                    )
+                    mine.append(time.perf_counter() - began)
+                    if response.status_code not in (200, 201):
+                        raise AssertionError(response.status_code)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+            with lock:
+                latencies.extend(mine)
+
+    threads = [threading.Thread(target=writer, args=(i, token)) for i, token in enumerate(tokens)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies, errors, len(task_writes)
+
+
+def run(writer_counts, votes, shards):
+    from django.db.models import Count, Sum
+    from django.test import override_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from movies.models import Movie, Rating, User
+    from movies.tasks import run_due
+
+    users = [
+        User.objects.create_user(email=f"writer{i}@example.com", password="benchpass123")
+        for i in range(max(writer_counts))
+    ]
+    tokens = [str(RefreshToken.for_user(user).access_token) for user in users]
+    rows = []
+    for count in writer_counts:
+        for label, shard_count in (("movie row", 0), (f"{shards} shards", shards)):
+            movie = Movie.objects.create(title=f"Premiere {count} {label}", genre="Drama",
+                                         release_year=2025, created_by=users[0])
+            with override_settings(MOVIES_RATING_SHARDS=shard_count, MOVIES_AGGREGATE_DELAY=0):
+                elapsed, latencies, errors, task_writes = drive(movie.pk, tokens[:count], votes)
+                while run_due(limit=1000)[0]:
+                    pass
+            movie.refresh_from_db()
+            recount = Rating.objects.filter(movie=movie).aggregate(n=Count("id"), total=Sum("rating"))
+            consistent = (movie.ratings_count, movie.ratings_sum) == (recount["n"], recount["total"])
+            rows.append((count, label, elapsed, latencies, len(errors), task_writes, consistent))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.contention")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16], help="Writer thread counts")
+    parser.add_argument("--votes", type=int, default=50, help="Rating POSTs per writer")
+    parser.add_argument("--shards", type=int, default=8, help="MOVIES_RATING_SHARDS for the sharded runs")
+    parser.add_argument("--db", help="SQLite file for the benchmark database (default: a temp file)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mrp.settings")
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+
+    if connection.vendor == "sqlite":
+        # threads need a real file, and writers that take the write lock up
+        # front wait for it instead of failing a deferred lock upgrade
+        name = args.db or os.path.join(tempfile.mkdtemp(), "contention.sqlite3")
+        settings.DATABASES["default"].setdefault("TEST", {})["NAME"] = name
+        settings.DATABASES["default"].setdefault("OPTIONS", {}).update(transaction_mode="IMMEDIATE", timeout=60)
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)  # errors are counted instead
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        rows = run(args.writers, args.votes, args.shards)
+    finally:
+        connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+
+    print(f"{args.votes} votes per writer, database {connection.vendor}")
+    print(f"{'writers':>7} {'counters':12} {'votes/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7} {'task writes':>11} {'consistent':>10}")
+    for count, label, elapsed, latencies, errors, task_writes, consistent in rows:
+        p50 = statistics.median(latencies) * 1000 if latencies else 0.0
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else p50
+        print(f"{count:7d} {label:12} {len(latencies) / elapsed:8.0f} {p50:8.2f} {p95:8.2f} {errors:7d} {task_writes:11d} {str(consistent):>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
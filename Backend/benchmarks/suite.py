@@ -0,0 +1,236 @@
+"""
+Endpoint benchmark scenarios, measurement and baseline comparison.
+
+Every named route in movies/urls.py must have at least one Scenario; the
+runner refuses to start otherwise so new endpoints can't ship unmeasured.
+"""
+import json
+import math
+import time
+from dataclasses import dataclass
+from io import StringIO
+from itertools import count
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from movies.models import Movie, Rating, User
+from movies.urls import urlpatterns
+
+
+SCALES = {
+    "1k": {"users": 100, "movies": 100, "ratings": 1_000},
+    "100k": {"users": 5_000, "movies": 5_000, "ratings": 100_000},
+    "1m": {"users": 20_000, "movies": 20_000, "ratings": 1_000_000},
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    route: str
+    method: str
+    # build(ctx) -> (path, body); runs outside the timed section
+    build: callable
+    auth: bool = False
+    content_type: str = "application/json"
+
+
+class QueryRecorder:
+    """execute_wrapper counting queries and timing them with perf_counter."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class Context:
+    """Ids and credentials the scenarios need, resolved once per run."""
+
+    def __init__(self):
+        self.user = (
+            User.objects.annotate(n=Count("ratings")).order_by("-n", "id").first()
+        )
+        self.popular_movie = Movie.objects.order_by("-ratings_count", "id").first()
+        self.genre = self.popular_movie.genre.name
+        self.title_word = self.popular_movie.title.split()[0]
+        # fixed at start so scenarios that create movies don't change the bulk payload
+        self.bulk_movie_ids = list(Movie.objects.order_by("id").values_list("id", flat=True)[:200])
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.sequence = count()
+
+    def next(self):
+        return next(self.sequence)
+
+    def throwaway_movie(self):
+        return Movie.objects.create(
+            title=f"Bench {self.next()}", genre="Drama", release_year=2000, created_by=self.user
+        ).pk
+
+
+SCENARIOS = [
+    Scenario("register", "register", "post",
+             lambda c: ("/api/auth/register/", {"email": f"bench{c.next()}@example.com", "password": "benchpass123"})),
+    Scenario("login", "login", "post",
+             lambda c: ("/api/auth/login/", {"email": c.user.email, "password": "password123"})),
+    Scenario("token-refresh", "token-refresh", "post",
+             lambda c: ("/api/auth/refresh/", {"refresh_token": str(RefreshToken.for_user(c.user))})),
+    Scenario("movie-list", "movie-list-create", "get", lambda c: ("/api/movies/?limit=100", None)),
+    Scenario("movie-list-deep-page", "movie-list-create", "get", lambda c: ("/api/movies/?limit=10&page=9", None)),
+    Scenario("movie-list-cursor", "movie-list-create", "get", lambda c: ("/api/movies/?limit=100&cursor=", None)),
+    Scenario("movie-list-fields", "movie-list-create", "get",
+             lambda c: ("/api/movies/?limit=100&fields=id,title,genre,ratings_avg", None)),
+    Scenario("movie-list-personal", "movie-list-create", "get", lambda c: ("/api/movies/?limit=100", None), auth=True),
+    Scenario("movie-list-genre-year", "movie-list-create", "get",
+             lambda c: (f"/api/movies/?genre={c.genre}&min_year=1990&max_year=2010", None)),
+    Scenario("movie-list-search", "movie-list-create", "get",
+             lambda c: (f"/api/movies/?search={c.title_word}", None)),
+    Scenario("movie-create", "movie-list-create", "post",
+             lambda c: ("/api/movies/", {"title": f"New {c.next()}", "genre": "Drama", "release_year": 2020}),
+             auth=True),
+    Scenario("movie-top", "movie-top", "get", lambda c: ("/api/movies/top/?limit=50", None)),
+    Scenario("movie-facets", "movie-facets", "get", lambda c: ("/api/movies/facets/", None)),
+    Scenario("movie-facets-search", "movie-facets", "get",
+             lambda c: (f"/api/movies/facets/?search={c.title_word}&min_year=1990", None)),
+    Scenario("movie-top-genre-decade", "movie-top", "get",
+             lambda c: (f"/api/movies/top/?genre={c.genre}&decade=1990", None)),
+    Scenario("movie-detail", "movie-detail", "get", lambda c: (f"/api/movies/{c.popular_movie.pk}/", None)),
+    Scenario("movie-batch", "movie-batch", "get",
+             lambda c: (f"/api/movies/batch/?ids={','.join(map(str, c.bulk_movie_ids[:50]))}", None)),
+    Scenario("movie-delete", "movie-detail", "delete", lambda c: (f"/api/movies/{c.throwaway_movie()}/", None),
+             auth=True),
+    Scenario("movie-similar", "movie-similar", "get", lambda c: (f"/api/movies/{c.popular_movie.pk}/similar/", None)),
+    Scenario("movie-ratings", "movie-rate", "get",
+             lambda c: (f"/api/movies/{c.popular_movie.pk}/ratings/?limit=100", None)),
+    # before ratings-bulk, which has the bench user rate every movie at 1k scale
+    Scenario("user-recommendations", "user-recommendations", "get",
+             lambda c: (f"/api/users/{c.user.pk}/recommendations/", None)),
+    Scenario("movie-rate", "movie-rate", "post",
+             lambda c: (f"/api/movies/{c.popular_movie.pk}/ratings/", {"rating": c.next() % 5 + 1}), auth=True),
+    Scenario("ratings-bulk", "ratings-bulk", "post",
+             lambda c: ("/api/ratings/bulk/",
+                        [{"movie": pk, "rating": (pk + c.next()) % 5 + 1} for pk in c.bulk_movie_ids]),
+             auth=True),
+    Scenario("movie-export", "movie-export", "get", lambda c: ("/api/movies/export/", None)),
+    Scenario("rating-export-csv", "rating-export", "get", lambda c: ("/api/ratings/export/?output=csv", None)),
+    Scenario("user-ratings", "user-ratings", "get",
+             lambda c: (f"/api/users/{c.user.pk}/ratings/?limit=100", None)),
+]
+
+
+def uncovered_routes(scenarios=SCENARIOS):
+    covered = {scenario.route for scenario in scenarios}
+    return sorted(p.name for p in urlpatterns if p.name and p.name not in covered)
+
+
+def load_dataset(scale, seed=42):
+    spec = SCALES[scale]
+    if Rating.objects.count() == spec["ratings"] and Movie.objects.count() >= spec["movies"]:
+        return False  # reused (--keepdb)
+    call_command("generate_dataset", seed=seed, chunk_size=20_000, stdout=StringIO(), **spec)
+    return True
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_scenario(scenario, ctx, iterations, warm_cache=False):
+    client = Client()
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {ctx.access_token}"} if scenario.auth else {}
+    latencies, queries, sql_ms, sizes, statuses = [], [], [], [], set()
+    for _ in range(iterations):
+        path, body = scenario.build(ctx)
+        if not warm_cache:
+            cache.clear()
+        kwargs = dict(headers)
+        if body is not None:
+            kwargs.update(data=json.dumps(body), content_type=scenario.content_type)
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            started = time.perf_counter()
+            response = getattr(client, scenario.method)(path, **kwargs)
+            content = b"".join(response.streaming_content) if response.streaming else response.content
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(recorder.count)
+        sql_ms.append(recorder.seconds * 1000)
+        sizes.append(len(content))
+        statuses.add(response.status_code)
+    return {
+        "route": scenario.route,
+        "iterations": iterations,
+        "status": sorted(statuses),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries": max(queries),
+        "sql_ms": round(sum(sql_ms) / len(sql_ms), 3),
+        "bytes": max(sizes),
+    }
+
+
+def run_suite(iterations=30, warm_cache=False, only=None, scenarios=SCENARIOS):
+    ctx = Context()
+    return {
+        scenario.name: run_scenario(scenario, ctx, iterations, warm_cache)
+        for scenario in scenarios
+        if not only or scenario.name in only
+    }
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Return human-readable regressions of `results` against `baseline`.
+
+    Latency may drift by `tolerance` (fractional) before it counts; query
+    counts are deterministic, so any increase is a regression.
+    """
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        current = results["scenarios"].get(name)
+        if current is None:
+            continue
+        if current["queries"] > base["queries"]:
+            regressions.append(f"{name}: queries {base['queries']} -> {current['queries']}")
+        limit = base["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms (limit {limit:.3f}ms)")
+    return regressions
+
+
+def update_baseline(results, baseline, tolerance=0.25):
+    """
+    Return (new baseline, re-recorded scenario names) for `results`.
+
+    Only scenarios that are new, changed their query count, or moved p95 by
+    more than `tolerance` either way take the new numbers; the rest keep
+    their recorded ones, so re-recording doesn't rewrite every scenario
+    with run-to-run noise. A baseline for another scale is replaced whole.
+    """
+    if baseline is None or baseline.get("scale") != results["scale"]:
+        return results, list(results["scenarios"])
+    scenarios = dict(baseline.get("scenarios", {}))
+    changed = []
+    for name, current in results["scenarios"].items():
+        base = scenarios.get(name)
+        if base is not None and current["queries"] == base["queries"] and (
+            abs(current["p95_ms"] - base["p95_ms"]) <= base["p95_ms"] * tolerance
+        ):
+            continue
+        scenarios[name] = current
+        changed.append(name)
+    return {**baseline, "scenarios": scenarios}, changed
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import async_views
+
+# Served under /api/async/; same paths and contracts as movies/urls.py
+urlpatterns = [
+    path("movies/", async_views.movie_list, name="async-movie-list"),
+    path("movies/<int:pk>/", async_views.movie_detail, name="async-movie-detail"),
+    path("movies/<int:pk>/ratings/", async_views.movie_ratings, name="async-movie-rate"),
+    path("users/<int:user_id>/ratings/", async_views.user_ratings, name="async-user-ratings"),
+]
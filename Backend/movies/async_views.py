@@ -0,0 +1,181 @@
+"""
+Native async (ASGI) versions of the hot read endpoints and the rating POST.
+
+They return the same JSON contract as the DRF views in views.py but await
+the database through Django's async ORM, so under uvicorn a single worker
+can hold many slow requests open without tying up a thread each. Writes
+still run inside transaction.atomic(), which is sync-only, via
+sync_to_async. The anonymous response cache/ETag layer is not applied here.
+"""
+import json
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound, ParseError, ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from .authentication import AsyncJWTAuthentication
+from .cache import get_cache
+from .models import Movie
+from .pagination import ContractPagination
+from .search import MovieSearchFilter
+from .serializers import MovieSerializer, RatingSerializer, clean_rating_value
+from .views import (
+    MovieListCreateView,
+    filter_movies,
+    movie_ratings_queryset,
+    rating_response_data,
+    upsert_rating,
+    user_ratings_queryset,
+)
+
+jwt_authentication = AsyncJWTAuthentication()
+
+
+class QueryParamsRequest:
+    """Just enough of a DRF Request for the pagination/search helpers."""
+
+    def __init__(self, request):
+        self._request = request
+        self.query_params = request.GET
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    # Same renderer as the DRF views, so bodies are byte-for-byte identical
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type="application/json",
+        status=status_code,
+        headers=headers,
+    )
+
+
+def api_view(view):
+    """Turn DRF APIExceptions raised by an async view into DRF-shaped responses."""
+
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+            headers = None
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                headers = {"WWW-Authenticate": jwt_authentication.authenticate_header(request)}
+            return render(data, exc.status_code, headers)
+
+    return wrapped
+
+
+async def get_movie_or_404(pk):
+    try:
+        return await Movie.objects.select_related("genre").aget(pk=pk)
+    except Movie.DoesNotExist:
+        raise NotFound("No Movie matches the given query.")
+
+
+async def paginate(request, queryset, serializer_class, cursor_ordering):
+    """Async twin of ContractPagination: page mode, or keyset mode with ?cursor=."""
+    paginator = ContractPagination()
+    params = request.GET
+    limit = paginator.get_page_size(QueryParamsRequest(request))
+
+    if paginator.cursor_query_param in params:
+        paginator.ordering = tuple(cursor_ordering)
+        cursor = params.get(paginator.cursor_query_param)
+        cache = get_cache()
+        key = paginator.total_cache_key(queryset)
+        total = await cache.aget(key)
+        if total is None and not cursor:
+            total = await queryset.order_by().acount()
+            await cache.aset(key, total, paginator.total_ttl())
+        queryset = queryset.order_by(*paginator.ordering)
+        if cursor:
+            queryset = queryset.filter(paginator.seek_filter(paginator.decode_cursor(cursor, queryset.model)))
+        rows = [row async for row in queryset[: limit + 1]]
+        next_cursor = paginator.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return {
+            "items": serializer_class(rows[:limit], many=True).data,
+            "limit": int(limit),
+            "next_cursor": next_cursor,
+            "total": total,
+        }
+
+    total = await queryset.acount()
+    num_pages = max(1, math.ceil(total / limit))
+    page = params.get(paginator.page_query_param) or 1
+    if page in paginator.last_page_strings:
+        page = num_pages
+    try:
+        page = int(page)
+    except (TypeError, ValueError):
+        raise NotFound(paginator.invalid_page_message)
+    if page < 1 or page > num_pages:
+        raise NotFound(paginator.invalid_page_message)
+    offset = (page - 1) * limit
+    rows = [row async for row in queryset[offset:offset + limit]]
+    return {
+        "items": serializer_class(rows, many=True).data,
+        "page": page,
+        "limit": int(limit),
+        "total": total,
+    }
+
+
+def request_data(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+    return request.POST
+
+
+@require_http_methods(["GET"])
+@api_view
+async def movie_list(request):
+    queryset = filter_movies(Movie.objects.select_related("genre").order_by("-id"), request.GET)
+    queryset = MovieSearchFilter().filter_queryset(QueryParamsRequest(request), queryset, MovieListCreateView)
+    return render(await paginate(request, queryset, MovieSerializer, MovieListCreateView.cursor_ordering))
+
+
+@require_http_methods(["GET"])
+@api_view
+async def movie_detail(request, pk):
+    return render(MovieSerializer(await get_movie_or_404(pk)).data)
+
+
+@csrf_exempt  # JWT in the Authorization header, same as the DRF views
+@require_http_methods(["GET", "POST"])
+@api_view
+async def movie_ratings(request, pk):
+    if request.method == "GET":
+        data = await paginate(request, movie_ratings_queryset(pk), RatingSerializer, ("-created_at", "-id"))
+        return render(data)
+
+    auth = await jwt_authentication.aauthenticate(request)
+    if auth is None:
+        raise NotAuthenticated()
+    user = auth[0]
+    movie = await get_movie_or_404(pk)
+    data = request_data(request)
+    try:
+        rating_value = clean_rating_value(data.get("rating"))
+    except ValidationError as exc:
+        return render({"detail": exc.detail[0]}, status.HTTP_400_BAD_REQUEST)
+
+    rating_obj, created = await sync_to_async(upsert_rating)(user, movie, rating_value, data.get("review", ""))
+    status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+    return render(rating_response_data(rating_obj, movie), status_code)
+
+
+@require_http_methods(["GET"])
+@api_view
+async def user_ratings(request, user_id):
+    data = await paginate(request, user_ratings_queryset(user_id), RatingSerializer, ("-created_at", "-id"))
+    return render(data)
@@ -0,0 +1,126 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+CATALOG_VERSION_KEY = "movies:version:catalog"
+# which movies exist and what they are filtered/searched on; votes don't move it
+MEMBERSHIP_VERSION_KEY = "movies:version:membership"
+
+
+def get_cache():
+    return caches[getattr(settings, "MOVIES_RESPONSE_CACHE_ALIAS", "default")]
+
+
+def movie_version_key(pk):
+    return f"movies:version:movie:{pk}"
+
+
+def _get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock rather than 1 so an evicted counter can never
+        # come back at a value that older cached entries were stored under.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def get_catalog_version():
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+def get_membership_version():
+    return _get_version(MEMBERSHIP_VERSION_KEY)
+
+
+def get_movie_version(pk):
+    return _get_version(movie_version_key(pk))
+
+
+def bump_movie_versions(pk=None):
+    """
+    Invalidate cached list pages (catalog) and, if given, one movie's detail.
+
+    Deferred to commit so a concurrent reader can't cache pre-commit data
+    under the new version.
+    """
+    def bump():
+        _bump_version(CATALOG_VERSION_KEY)
+        if pk is not None:
+            _bump_version(movie_version_key(pk))
+
+    transaction.on_commit(bump)
+
+
+def bump_membership_version():
+    """Invalidate responses that depend only on the set of movies (e.g. facets), at commit."""
+    transaction.on_commit(lambda: _bump_version(MEMBERSHIP_VERSION_KEY))
+
+
+class VersionedCacheMixin:
+    """
+    Serve anonymous GETs from the response cache, keyed on the request path,
+    the normalized query string and a version counter.
+
+    The ETag is derived from that key, so `If-None-Match` revalidations are
+    answered with 304 before the database is touched. Views pick their
+    version through get_cache_version(): the catalog counter for lists, the
+    per-movie counter for details.
+    """
+
+    # authenticated GETs skip the cache unless the body doesn't depend on the user
+    cache_authenticated = False
+
+    def get_cache_version(self):
+        return get_catalog_version()
+
+    def get_cache_key(self, request):
+        params = sorted((k, v) for k in request.query_params for v in request.query_params.getlist(k))
+        raw = f"{request.path}|{params!r}|{self.get_cache_version()}"
+        return "movies:response:" + hashlib.sha1(raw.encode()).hexdigest()
+
+    def cached_response(self, request, build):
+        if request.method != "GET" or (request.user.is_authenticated and not self.cache_authenticated):
+            return build()
+
+        key = self.get_cache_key(request)
+        etag = f'"{key.rsplit(":", 1)[-1]}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache = get_cache()
+            data = cache.get(key)
+            if data is None:
+                response = build()
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                timeout = getattr(settings, "MOVIES_RESPONSE_CACHE_TIMEOUT", 300)
+                cache.set(key, response.data, timeout)
+            else:
+                response = Response(data)
+        response["ETag"] = etag
+        # let browsers keep the body but always revalidate with If-None-Match
+        response["Cache-Control"] = "no-cache"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(VersionedCacheMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(VersionedCacheMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,39 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def stream_ndjson(serializer, queryset):
+    fields = serializer.fields
+    for row in serializer.rows(queryset):
+        yield json.dumps(dict(zip(fields, row)), separators=(",", ":")) + "\n"
+
+
+def stream_csv(serializer, queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(serializer.fields)
+    for row in serializer.rows(queryset):
+        yield writer.writerow(
+            [json.dumps(value, separators=(",", ":")) if isinstance(value, dict) else value for value in row]
+        )
+
+
+EXPORT_FORMATS = {
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+    "csv": (stream_csv, "text/csv"),
+}
+
+
+def export_response(serializer, queryset, output, filename):
+    stream, content_type = EXPORT_FORMATS[output]
+    response = StreamingHttpResponse(stream(serializer, queryset), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{output}"'
+    return response
@@ -0,0 +1,79 @@
+"""
+Sparse fieldsets: `?fields=id,title` / `?exclude=description`.
+
+SparseFieldsMixin lets a serializer be built with a subset of its fields;
+`row_sources` maps output fields to the model columns they read when those
+aren't a same-named column (see rows.py).
+SparseFieldsetMixin does the view side: it parses the query parameters,
+hands the subset to the serializer and pushes the matching `.only()` into
+the GET queryset, so a narrow request also selects fewer columns.
+"""
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsMixin:
+    # output field -> lookup, or {key: lookup} for nested output
+    row_sources = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, params):
+        """The field subset asked for by ?fields= / ?exclude=, or None for all of them."""
+        fields = [name for name in params.get("fields", "").split(",") if name.strip()]
+        exclude = [name for name in params.get("exclude", "").split(",") if name.strip()]
+        if not fields and not exclude:
+            return None
+        available = cls.Meta.fields
+        unknown = sorted({name.strip() for name in fields + exclude} - set(available))
+        if unknown:
+            raise ValidationError(
+                {"detail": f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}."}
+            )
+        fields = {name.strip() for name in fields} or set(available)
+        fields -= {name.strip() for name in exclude}
+        return tuple(name for name in available if name in fields)
+
+    @classmethod
+    def columns_for(cls, fields):
+        columns = []
+        for name in fields:
+            source = cls.row_sources.get(name, name)
+            columns.extend(source.values() if isinstance(source, dict) else [source])
+        return columns
+
+
+class SparseFieldsetMixin:
+    """
+    View mixin for serializers using SparseFieldsMixin. The pk and the
+    `cursor_ordering` columns are always loaded so pagination keeps working.
+    """
+
+    def get_sparse_fields(self):
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = self.get_serializer_class().requested_fields(self.request.query_params)
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == "GET":
+            kwargs.setdefault("fields", self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def narrow_queryset(self, queryset):
+        fields = self.get_sparse_fields() if self.request.method == "GET" else None
+        if fields is None:
+            return queryset
+        ordering = [name.lstrip("-") for name in getattr(self, "cursor_ordering", ())]
+        columns = ["id", *ordering, *self.get_serializer_class().columns_for(fields)]
+        # annotations are part of the SELECT already and can't go through .only()
+        columns = [column for column in columns if column not in queryset.query.annotations]
+        # join only the relations the remaining fields read through
+        related = {column.rsplit("__", 1)[0] for column in columns if "__" in column}
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*dict.fromkeys(columns))
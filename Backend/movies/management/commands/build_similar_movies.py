@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from movies.similarity import build_similar, movie_features, store_similar
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute content-based neighbors (description TF-IDF, genre, release year) "
+        "for /api/movies/<id>/similar/ and store the top-k per movie."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=20, help="Similar movies kept per movie")
+        parser.add_argument("--block-size", type=int, default=512, help="Movies per similarity block")
+
+    def handle(self, *args, k, block_size, **options):
+        if k < 1 or block_size < 1:
+            raise CommandError("--k and --block-size must be positive")
+        started = time.monotonic()
+        similar = build_similar(movie_features(), k=k, block_size=block_size)
+        with transaction.atomic():
+            store_similar(similar, replace_all=True)
+        pairs = sum(len(rows) for rows in similar.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{pairs} similar pair(s) for {len(similar)} movie(s) in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,118 @@
+import random
+import time
+from itertools import accumulate
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from movies.models import Genre, Movie, Rating, User
+
+
+GENRES = ["Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary",
+          "Drama", "Fantasy", "Horror", "Mystery", "Romance", "Sci-Fi", "Thriller"]
+WORDS = ["night", "city", "last", "dark", "love", "war", "river", "ghost", "star",
+         "summer", "king", "road", "secret", "storm", "heart", "empire", "shadow", "dream"]
+# J-shaped star distribution typical of public rating sites
+STAR_WEIGHTS = {1: 0.07, 2: 0.09, 3: 0.19, 4: 0.33, 5: 0.32}
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic users/movies/ratings dataset with chunked "
+        "bulk_create, then compute rating aggregates once at the end. "
+        "Meant for an empty database: movies are always appended."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42, help="RNG seed; same seed, same dataset")
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--movies", type=int, default=1000)
+        parser.add_argument("--ratings", type=int, default=10000)
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk_create transaction")
+        parser.add_argument("--password", default="password123", help="Password shared by every generated user")
+
+    def handle(self, *args, seed, users, movies, ratings, chunk_size, password, **options):
+        if ratings > users * movies:
+            raise CommandError("--ratings cannot exceed --users x --movies (one rating per user per movie)")
+        rng = random.Random(seed)
+        started = time.monotonic()
+
+        user_ids = self.create_users(users, password, chunk_size)
+        movie_ids = self.create_movies(rng, movies, user_ids, chunk_size)
+        self.create_ratings(rng, ratings, user_ids, movie_ids, chunk_size)
+
+        call_command("rebuild_rating_aggregates", stdout=StringIO())
+        call_command("rebuild_leaderboard", stdout=StringIO())
+        call_command("build_recommendations", stdout=StringIO())
+        call_command("build_similar_movies", stdout=StringIO())
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(user_ids)} users, {len(movie_ids)} movies, {ratings} ratings "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
+
+    def create_users(self, count, password, chunk_size):
+        # One PBKDF2 hash for everyone instead of one per create_user() call
+        hashed = make_password(password)
+        emails = [f"user{i}@example.com" for i in range(1, count + 1)]
+        for start in range(0, count, chunk_size):
+            chunk = emails[start:start + chunk_size]
+            with transaction.atomic():
+                User.objects.bulk_create(
+                    [User(email=email, username=email.split("@")[0], password=hashed) for email in chunk],
+                    ignore_conflicts=True,
+                )
+        self.stdout.write(f"users: {count}")
+        by_email = dict(User.objects.filter(email__in=emails).values_list("email", "id"))
+        return [by_email[email] for email in emails]
+
+    def create_movies(self, rng, count, user_ids, chunk_size):
+        ids = []
+        genres = [Genre.resolve(name) for name in GENRES]
+        for start in range(0, count, chunk_size):
+            batch = []
+            for i in range(start + 1, min(start + chunk_size, count) + 1):
+                title = " ".join(rng.sample(WORDS, k=rng.randint(1, 3))).title()
+                genre = rng.choice(genres)
+                batch.append(Movie(
+                    title=f"{title} {i}",
+                    genre=genre,
+                    release_year=rng.randint(1950, 2025),
+                    description=f"A {genre.name.lower()} story about {' and '.join(rng.sample(WORDS, k=3))}.",
+                    created_by_id=rng.choice(user_ids),
+                ))
+            with transaction.atomic():
+                ids.extend(movie.pk for movie in Movie.objects.bulk_create(batch))
+        self.stdout.write(f"movies: {count}")
+        return ids
+
+    def create_ratings(self, rng, count, user_ids, movie_ids, chunk_size):
+        stars, weights = zip(*STAR_WEIGHTS.items())
+        star_cum = list(accumulate(weights))
+        # Zipf-like popularity: a few titles get most of the votes
+        movie_cum = list(accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(movie_ids))))
+        bias = [rng.gauss(0, 0.7) for _ in movie_ids]
+        n_users, n_movies = len(user_ids), len(movie_ids)
+        seen = set()
+        created = 0
+        while created < count:
+            want = min(chunk_size, count - created)
+            batch = []
+            for movie_idx in rng.choices(range(n_movies), cum_weights=movie_cum, k=want):
+                user_idx = rng.randrange(n_users)
+                # popular titles saturate first; fall back to a uniform pick on collision
+                while user_idx * n_movies + movie_idx in seen:
+                    movie_idx, user_idx = rng.randrange(n_movies), rng.randrange(n_users)
+                seen.add(user_idx * n_movies + movie_idx)
+                value = rng.choices(stars, cum_weights=star_cum)[0] + bias[movie_idx]
+                batch.append(Rating(
+                    user_id=user_ids[user_idx],
+                    movie_id=movie_ids[movie_idx],
+                    rating=min(5, max(1, round(value))),
+                ))
+            with transaction.atomic():
+                Rating.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+            self.stdout.write(f"ratings: {created}/{count}")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from movies.models import BlacklistedToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete blacklisted refresh-token jtis whose tokens have expired; "
+        "they can no longer be presented, so the rows only grow the table."
+    )
+
+    def handle(self, *args, **options):
+        deleted, _ = BlacklistedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} expired token(s) pruned."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from movies.models import Movie, MovieRanking, RankingPrior
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the leaderboard prior (catalog mean rating) and rewrite every "
+        "MovieRanking row with it. Rating writes keep rows current between runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per upsert batch")
+
+    def handle(self, *args, batch_size=1000, **options):
+        with transaction.atomic():
+            mean = RankingPrior.compute_mean()
+            RankingPrior.set_mean(mean)
+            movies = Movie.objects.filter(ratings_count__gt=0).only(*MovieRanking.SOURCE_FIELDS)
+            MovieRanking.objects.exclude(movie__ratings_count__gt=0).delete()
+            MovieRanking.sync(movies.iterator(chunk_size=batch_size), mean=mean, batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{MovieRanking.objects.count()} movie(s) ranked, prior mean {mean:.3f}, "
+            f"min votes {MovieRanking.min_votes()}."
+        ))
@@ -0,0 +1,51 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from movies.models import Movie, MovieRanking, MovieRatingShard, Rating
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild Movie.ratings_count / ratings_sum / ratings_avg and the star "
+        "histogram (ratings_1..ratings_5) from the Rating table in one grouped "
+        "pass and report any drift from the stored values. Unfolded rating shards "
+        "(MOVIES_RATING_SHARDS) show up as drift and are discarded by the rebuild."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without writing fixes")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk_update batch")
+
+    def handle(self, *args, dry_run=False, batch_size=1000, **options):
+        histograms = defaultdict(dict)
+        grouped = Rating.objects.order_by().values_list("movie_id", "rating").annotate(n=Count("id"))
+        for movie_id, star, n in grouped.iterator():
+            histograms[movie_id][star] = n
+
+        drifted = []
+        fields = ("title", *Movie.AGGREGATE_FIELDS, *MovieRanking.SOURCE_FIELDS)
+        for movie in Movie.objects.only(*fields).iterator(chunk_size=batch_size):
+            stored = {field: getattr(movie, field) for field in Movie.AGGREGATE_FIELDS}
+            movie.set_histogram(histograms.get(movie.id, {}))
+            changes = [
+                f"{field} {stored[field]} -> {getattr(movie, field)}"
+                for field in Movie.AGGREGATE_FIELDS
+                if stored[field] != getattr(movie, field)
+            ]
+            if not changes:
+                continue
+            self.stdout.write(f"drift: movie {movie.id} ({movie.title}): " + ", ".join(changes))
+            drifted.append(movie)
+
+        if drifted and not dry_run:
+            with transaction.atomic():
+                Movie.objects.bulk_update(drifted, Movie.AGGREGATE_FIELDS, batch_size=batch_size)
+                MovieRanking.sync(drifted, batch_size=batch_size)
+                # the recount covers whatever the shards were still holding
+                MovieRatingShard.objects.filter(movie__in=drifted).delete()
+
+        verb = "found" if dry_run else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} movie(s) with drifted aggregates {verb}."))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.tasks import run_due
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks (e.g. deferred rating aggregate recomputes, "
+        "see MOVIES_DEFER_AGGREGATES). Polls until stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the tasks due now, then exit")
+        parser.add_argument("--batch-size", type=int, default=100, help="Tasks claimed per poll")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when the queue is idle")
+
+    def handle(self, *args, once, batch_size, interval, **options):
+        if batch_size < 1 or interval <= 0:
+            raise CommandError("--batch-size and --interval must be positive")
+        total = failures = 0
+        try:
+            while True:
+                ran, failed = run_due(limit=batch_size)
+                total, failures = total + ran, failures + failed
+                if ran < batch_size:
+                    if once:
+                        break
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"{total} task(s) run, {failures} failed"))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:24
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_ratings_sum(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    Rating = apps.get_model("movies", "Rating")
+    totals = Rating.objects.values("movie_id").annotate(total=Sum("rating"))
+    for row in totals.iterator():
+        Movie.objects.filter(pk=row["movie_id"]).update(ratings_sum=row["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='ratings_sum',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_ratings_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:26
+
+from django.db import migrations
+
+
+# External-content FTS5 index over movies_movie; the triggers keep it in step
+# with every insert, update and delete so the table never needs a rebuild.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS movies_movie_fts USING fts5(
+        title, description, genre,
+        content='movies_movie', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_movie_fts_ai AFTER INSERT ON movies_movie BEGIN
+        INSERT INTO movies_movie_fts(rowid, title, description, genre)
+        VALUES (new.id, new.title, new.description, new.genre);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_movie_fts_ad AFTER DELETE ON movies_movie BEGIN
+        INSERT INTO movies_movie_fts(movies_movie_fts, rowid, title, description, genre)
+        VALUES ('delete', old.id, old.title, old.description, old.genre);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_movie_fts_au AFTER UPDATE OF title, description, genre ON movies_movie BEGIN
+        INSERT INTO movies_movie_fts(movies_movie_fts, rowid, title, description, genre)
+        VALUES ('delete', old.id, old.title, old.description, old.genre);
+        INSERT INTO movies_movie_fts(rowid, title, description, genre)
+        VALUES (new.id, new.title, new.description, new.genre);
+    END
+    """,
+    "INSERT INTO movies_movie_fts(movies_movie_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS movies_movie_fts_au",
+    "DROP TRIGGER IF EXISTS movies_movie_fts_ad",
+    "DROP TRIGGER IF EXISTS movies_movie_fts_ai",
+    "DROP TABLE IF EXISTS movies_movie_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # Other backends fall back to SearchFilter's icontains lookups
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_movie_ratings_sum'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_FTS), _run(DROP_FTS)),
+    ]
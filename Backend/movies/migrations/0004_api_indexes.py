@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:27
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_movie_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(django.db.models.functions.text.Lower('genre'), models.OrderBy(models.F('id'), descending=True), name='movie_genre_ci_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['release_year'], name='movie_release_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['movie', '-created_at', '-id'], name='rating_movie_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='rating_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_rankings(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    MovieRanking = apps.get_model("movies", "MovieRanking")
+    RankingPrior = apps.get_model("movies", "RankingPrior")
+    totals = Movie.objects.aggregate(total=Sum("ratings_sum"), count=Sum("ratings_count"))
+    mean = totals["total"] / totals["count"] if totals["count"] else 3.0
+    RankingPrior.objects.create(pk=1, mean=mean)
+    min_votes = getattr(settings, "MOVIES_TOP_MIN_VOTES", 10)
+    rows = (
+        MovieRanking(
+            movie_id=movie.pk,
+            score=(movie.ratings_sum + min_votes * mean) / (movie.ratings_count + min_votes),
+            votes=movie.ratings_count,
+            genre_ci=movie.genre.lower(),
+            decade=movie.release_year // 10 * 10,
+        )
+        for movie in Movie.objects.filter(ratings_count__gt=0).iterator()
+    )
+    MovieRanking.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0005_blacklisted_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingPrior',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MovieRanking',
+            fields=[
+                ('movie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='movies.movie')),
+                ('score', models.FloatField()),
+                ('votes', models.PositiveIntegerField()),
+                ('genre_ci', models.CharField(max_length=100)),
+                ('decade', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(models.OrderBy(models.F('score'), descending=True), models.F('movie'), name='ranking_score_idx'), models.Index(models.F('genre_ci'), models.OrderBy(models.F('score'), descending=True), models.F('movie'), name='ranking_genre_score_idx'), models.Index(models.F('decade'), models.OrderBy(models.F('score'), descending=True), models.F('movie'), name='ranking_decade_score_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rankings, migrations.RunPython.noop),
+    ]
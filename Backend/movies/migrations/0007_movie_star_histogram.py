@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:56
+
+from collections import defaultdict
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Count
+
+fts = import_module("movies.migrations.0003_movie_fts")
+
+
+def backfill_histograms(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    Rating = apps.get_model("movies", "Rating")
+    histograms = defaultdict(dict)
+    grouped = Rating.objects.order_by().values_list("movie_id", "rating").annotate(n=Count("id"))
+    for movie_id, star, n in grouped.iterator():
+        histograms[movie_id][f"ratings_{star}"] = n
+    for movie_id, counts in histograms.items():
+        Movie.objects.filter(pk=movie_id).update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='ratings_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='ratings_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='ratings_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='ratings_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='ratings_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_histograms, migrations.RunPython.noop),
+        # SQLite adds these columns by rebuilding movies_movie, which drops the
+        # FTS triggers with the old table; put them back and reindex.
+        migrations.RunPython(fts._run(fts.CREATE_FTS), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_movie_neighbors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarMovie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similarity', models.FloatField()),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_movies', to='movies.movie')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='movies.movie')),
+            ],
+            options={
+                'indexes': [models.Index(models.F('movie'), models.OrderBy(models.F('similarity'), descending=True), name='similar_movie_sim_idx')],
+                'constraints': [models.UniqueConstraint(fields=('movie', 'similar'), name='similar_movie_unique')],
+            },
+        ),
+    ]
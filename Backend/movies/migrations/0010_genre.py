@@ -0,0 +1,180 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:56
+
+from importlib import import_module
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+fts = import_module("movies.migrations.0003_movie_fts")
+
+
+# The genre name now lives in movies_genre, which an external-content index
+# over movies_movie can't read, so the FTS table keeps its own copy of the
+# indexed text. Triggers on both tables keep it in step; re-running this list
+# (e.g. after a migration rebuilds movies_movie) restores them and reindexes.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS movies_movie_fts USING fts5(
+        title, description, genre,
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_movie_fts_ai AFTER INSERT ON movies_movie BEGIN
+        INSERT INTO movies_movie_fts(rowid, title, description, genre)
+        VALUES (new.id, new.title, new.description, (SELECT name FROM movies_genre WHERE id = new.genre_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_movie_fts_ad AFTER DELETE ON movies_movie BEGIN
+        DELETE FROM movies_movie_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_movie_fts_au AFTER UPDATE OF title, description, genre_id ON movies_movie BEGIN
+        UPDATE movies_movie_fts
+        SET title = new.title, description = new.description,
+            genre = (SELECT name FROM movies_genre WHERE id = new.genre_id)
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_genre_fts_au AFTER UPDATE OF name ON movies_genre BEGIN
+        UPDATE movies_movie_fts SET genre = new.name
+        WHERE rowid IN (SELECT id FROM movies_movie WHERE genre_id = new.id);
+    END
+    """,
+    "DELETE FROM movies_movie_fts",
+    """
+    INSERT INTO movies_movie_fts(rowid, title, description, genre)
+    SELECT movie.id, movie.title, movie.description, genre.name
+    FROM movies_movie movie JOIN movies_genre genre ON genre.id = movie.genre_id
+    """,
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS movies_genre_fts_au",
+    "DROP TRIGGER IF EXISTS movies_movie_fts_au",
+    "DROP TRIGGER IF EXISTS movies_movie_fts_ad",
+    "DROP TRIGGER IF EXISTS movies_movie_fts_ai",
+    "DROP TABLE IF EXISTS movies_movie_fts",
+]
+
+
+def link_genres(apps, schema_editor):
+    Genre = apps.get_model("movies", "Genre")
+    Movie = apps.get_model("movies", "Movie")
+    genres = {}
+    # most common spelling first, so it names the genre
+    spellings = Movie.objects.order_by().values_list("genre").annotate(n=Count("id")).order_by("-n", "genre")
+    for name, _ in spellings:
+        key = name.strip().casefold()
+        if key not in genres:
+            genres[key] = Genre.objects.create(name=name.strip(), key=key)
+        Movie.objects.filter(genre=name).update(genre_ref=genres[key])
+
+
+def unlink_genres(apps, schema_editor):
+    Genre = apps.get_model("movies", "Genre")
+    Movie = apps.get_model("movies", "Movie")
+    for genre in Genre.objects.all():
+        Movie.objects.filter(genre_ref=genre).update(genre=genre.name)
+
+
+def copy_ranking_genres(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    MovieRanking = apps.get_model("movies", "MovieRanking")
+    MovieRanking.objects.update(
+        genre_id=Subquery(Movie.objects.filter(pk=OuterRef("movie_id")).values("genre_id")[:1])
+    )
+
+
+def copy_ranking_genre_keys(apps, schema_editor):
+    Genre = apps.get_model("movies", "Genre")
+    MovieRanking = apps.get_model("movies", "MovieRanking")
+    for genre in Genre.objects.all():
+        MovieRanking.objects.filter(genre=genre).update(genre_ci=genre.name.lower())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0009_similar_movies'),
+    ]
+
+    operations = [
+        # the old triggers read movies_movie.genre, which is about to go
+        migrations.RunPython(fts._run(fts.DROP_FTS), fts._run(fts.CREATE_FTS)),
+        migrations.CreateModel(
+            name='Genre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='genre_ref',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='movies.genre'),
+        ),
+        migrations.RunPython(link_genres, unlink_genres),
+        migrations.RemoveIndex(
+            model_name='movie',
+            name='movie_genre_ci_id_idx',
+        ),
+        # blank, so that unapplying can re-add the column before it is refilled
+        migrations.AlterField(
+            model_name='movie',
+            name='genre',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='movie',
+            name='genre',
+        ),
+        migrations.RenameField(
+            model_name='movie',
+            old_name='genre_ref',
+            new_name='genre',
+        ),
+        migrations.AlterField(
+            model_name='movie',
+            name='genre',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='movies', to='movies.genre'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['genre', '-id'], name='movie_genre_id_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='movieranking',
+            name='ranking_genre_score_idx',
+        ),
+        migrations.AddField(
+            model_name='movieranking',
+            name='genre',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='movies.genre'),
+        ),
+        migrations.RunPython(copy_ranking_genres, copy_ranking_genre_keys),
+        migrations.AlterField(
+            model_name='movieranking',
+            name='genre_ci',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='movieranking',
+            name='genre_ci',
+        ),
+        migrations.AlterField(
+            model_name='movieranking',
+            name='genre',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='movies.genre'),
+        ),
+        migrations.AddIndex(
+            model_name='movieranking',
+            index=models.Index(models.F('genre'), models.OrderBy(models.F('score'), descending=True), models.F('movie'), name='ranking_genre_score_idx'),
+        ),
+        migrations.RunPython(fts._run(CREATE_FTS), fts._run(DROP_FTS)),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0011_task_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieRatingShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('ratings_1', models.IntegerField(default=0)),
+                ('ratings_2', models.IntegerField(default=0)),
+                ('ratings_3', models.IntegerField(default=0)),
+                ('ratings_4', models.IntegerField(default=0)),
+                ('ratings_5', models.IntegerField(default=0)),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_shards', to='movies.movie')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('movie', 'shard'), name='rating_shard_unique')],
+            },
+        ),
+    ]
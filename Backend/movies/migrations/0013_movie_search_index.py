@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0012_rating_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieSearchIndex',
+            fields=[
+                ('movie', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='movies.movie')),
+                ('document', models.TextField(db_column='movies_movie_fts')),
+            ],
+            options={
+                'db_table': 'movies_movie_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,9 +1,16 @@
+import random
+from datetime import timedelta
 from decimal import Decimal, ROUND_HALF_UP
 from django.conf import settings
-from django.db import models
-from django.db.models import Avg, Count
+from django.db import models, transaction
+from django.utils import timezone
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from .cache import bump_membership_version, bump_movie_versions, get_cache
+
 
 User = settings.AUTH_USER_MODEL  # usually "auth.User"
 
@@ -45,9 +52,57 @@ class User(AbstractUser):
         return self.email
 
 
+class Genre(models.Model):
+    """
+    Genre lookup table. Movies point at a row by integer FK; `key` is the
+    case-folded name that ?genre= matches, `name` the spelling shown.
+    """
+
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.key = self.key_for(self.name)
+        super().save(*args, **kwargs)
+        if not adding:
+            # a rename shows up on every cached page listing one of its movies
+            bump_movie_versions()
+            bump_membership_version()
+            for pk in self.movies.values_list("pk", flat=True).iterator():
+                bump_movie_versions(pk)
+
+    @staticmethod
+    def key_for(name):
+        return name.strip().casefold()
+
+    @classmethod
+    def resolve(cls, name):
+        """The Genre called `name` (case-insensitively), created on first use."""
+        genre, _ = cls.objects.get_or_create(key=cls.key_for(name), defaults={"name": name.strip()})
+        return genre
+
+    @classmethod
+    def id_for(cls, name):
+        """Subquery for the id of the genre called `name`, so filters stay one statement."""
+        return models.Subquery(cls.objects.filter(key=cls.key_for(name)).values("id")[:1])
+
+
+class MovieManager(models.Manager):
+    def create(self, **kwargs):
+        # accept a genre name as well as a Genre
+        if isinstance(kwargs.get("genre"), str):
+            kwargs["genre"] = Genre.resolve(kwargs["genre"])
+        return super().create(**kwargs)
+
+
 class Movie(models.Model):
     title = models.CharField(max_length=255)
-    genre = models.CharField(max_length=100)
+    # indexed through movie_genre_id_idx below
+    genre = models.ForeignKey(Genre, on_delete=models.PROTECT, related_name="movies", db_index=False)
     release_year = models.PositiveIntegerField()
     description = models.TextField(blank=True, null=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="movies")
@@ -55,22 +110,344 @@ class Movie(models.Model):
 
     # denormalized aggregate fields (kept consistent by application logic)
     ratings_count = models.PositiveIntegerField(default=0)
+    ratings_sum = models.PositiveBigIntegerField(default=0)
     ratings_avg = models.DecimalField(max_digits=4, decimal_places=2, default=Decimal("0.00"))
+    # star histogram: ratings_1 .. ratings_5 count the ratings at each star
+    ratings_1 = models.PositiveIntegerField(default=0)
+    ratings_2 = models.PositiveIntegerField(default=0)
+    ratings_3 = models.PositiveIntegerField(default=0)
+    ratings_4 = models.PositiveIntegerField(default=0)
+    ratings_5 = models.PositiveIntegerField(default=0)
+
+    # Task names: the per-movie recompute queued by deferred rating writes,
+    # the fold of a movie's MovieRatingShard rows, and a created movie's
+    # "similar" list
+    AGGREGATE_TASK = "movies.recompute_aggregates"
+    FOLD_TASK = "movies.fold_rating_shards"
+    SIMILAR_TASK = "movies.refresh_similar"
+
+    # what ?genre=/?min_year=/?search= and the facets look at
+    MEMBERSHIP_FIELDS = frozenset({"title", "description", "genre", "release_year"})
+
+    STARS = range(1, 6)
+    HISTOGRAM_FIELDS = tuple(f"ratings_{star}" for star in STARS)
+    AGGREGATE_FIELDS = ("ratings_count", "ratings_sum", "ratings_avg", *HISTOGRAM_FIELDS)
+
+    objects = MovieManager()
+
+    class Meta:
+        indexes = [
+            # ?genre= as an integer match, already in -id order for the list view
+            models.Index(fields=["genre", "-id"], name="movie_genre_id_idx"),
+            # ?min_year= / ?max_year= ranges
+            models.Index(fields=["release_year"], name="movie_release_year_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if not (adding or update_fields) or set(update_fields or ()) & MovieRanking.SOURCE_FIELDS:
+            MovieRanking.sync([self])
+        if adding or not update_fields or set(update_fields) & self.MEMBERSHIP_FIELDS:
+            bump_membership_version()
+        bump_movie_versions(self.pk)
+
+    @staticmethod
+    def average_from(total, count):
+        """Derive the 2dp ratings_avg from a running sum and count."""
+        if not count:
+            return Decimal("0.00")
+        return (Decimal(total) / Decimal(count)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+    @classmethod
+    def rating_delta(cls, old=None, new=None):
+        """
+        Per-star count changes (1..5) for an insert (old=None), update or
+        delete (new=None). count and sum deltas are derived from these.
+        """
+        return tuple((star == new) - (star == old) for star in cls.STARS)
+
+    @classmethod
+    def histogram_from(cls, counts):
+        """{1: n, ..., 5: n} -> (ratings_count, ratings_sum) for the same ratings."""
+        return sum(counts.values()), sum(star * n for star, n in counts.items())
+
+    def apply_rating_change(self, old=None, new=None):
+        """
+        Apply a single rating insert, update or delete to the running
+        aggregates in O(1) and refresh them on this instance.
+
+        When the change was only queued (MOVIES_DEFER_AGGREGATES or
+        MOVIES_RATING_SHARDS), the instance keeps the stored aggregates and
+        `aggregates_pending` is set instead. They can't be patched in memory:
+        earlier queued changes, even this user's own, aren't in them yet.
+        """
+        delta = self.rating_delta(old, new)
+        updated = Movie.apply_rating_deltas({self.pk: delta})
+        if self.pk in updated:
+            fresh = updated[self.pk]
+            for field in self.AGGREGATE_FIELDS:
+                setattr(self, field, getattr(fresh, field))
+        elif any(delta):
+            self.aggregates_pending = True
+
+    @classmethod
+    def apply_rating_deltas(cls, deltas):
+        """
+        Apply {movie_id: per-star deltas (see rating_delta)} to the running
+        aggregates and star histogram, and return the updated movies keyed
+        by id.
+
+        The counters are bumped with F() expressions so concurrent writers
+        never lose an update; ratings_avg is then re-derived from the stored
+        values while the rows are still locked by this transaction.
+
+        With MOVIES_DEFER_AGGREGATES nothing is applied here: each movie gets
+        a queued recompute instead (see tasks.py) and {} is returned. With
+        MOVIES_RATING_SHARDS the deltas land in one random MovieRatingShard
+        row per movie, again returning {}; a fold is queued only when that
+        shard was empty, so votes on a hot movie don't all write its Task row.
+        """
+        deltas = {pk: delta for pk, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return {}
+        delay = getattr(settings, "MOVIES_AGGREGATE_DELAY", 1.0)
+        if getattr(settings, "MOVIES_DEFER_AGGREGATES", False):
+            Task.enqueue(cls.AGGREGATE_TASK, deltas, delay=delay)
+            return {}
+        shards = getattr(settings, "MOVIES_RATING_SHARDS", 0)
+        if shards:
+            with transaction.atomic(savepoint=False):
+                started = MovieRatingShard.add(deltas, shards)
+                if started:
+                    Task.enqueue(cls.FOLD_TASK, started, delay=delay)
+            return {}
+        return cls._apply_rating_deltas(deltas)
+
+    @classmethod
+    def _apply_rating_deltas(cls, deltas):
+        with transaction.atomic(savepoint=False):
+            for pk, stars in deltas.items():
+                updates = {
+                    field: F(field) + change for field, change in zip(cls.HISTOGRAM_FIELDS, stars) if change
+                }
+                count_delta = sum(stars)
+                sum_delta = sum(star * change for star, change in zip(cls.STARS, stars))
+                if count_delta:
+                    updates["ratings_count"] = F("ratings_count") + count_delta
+                if sum_delta:
+                    updates["ratings_sum"] = F("ratings_sum") + sum_delta
+                cls.objects.filter(pk=pk).update(**updates)
+            movies = cls.objects.filter(pk__in=deltas).only(*MovieRanking.SOURCE_FIELDS, *cls.AGGREGATE_FIELDS)
+            movies = {movie.pk: movie for movie in movies}
+            for movie in movies.values():
+                movie.ratings_avg = cls.average_from(movie.ratings_sum, movie.ratings_count)
+                bump_movie_versions(movie.pk)
+            cls.objects.bulk_update(movies.values(), ["ratings_avg"])
+            MovieRanking.sync(movies.values())
+        return movies
+
+    @classmethod
+    def fold_rating_shards(cls, pks):
+        """
+        Move the deltas parked in the movies' MovieRatingShard rows into their
+        aggregates; returns the updated movies keyed by id.
+
+        Each shard is decremented by what was read from it rather than zeroed,
+        so a vote that lands on a shard mid-fold is kept for the next one.
+        """
+        with transaction.atomic():
+            shards = MovieRatingShard.objects.select_for_update().filter(movie_id__in=pks)
+            deltas = {}
+            for shard in shards:
+                stars = shard.stars()
+                if not any(stars):
+                    continue
+                MovieRatingShard.objects.filter(pk=shard.pk).update(
+                    **{field: F(field) - n for field, n in zip(cls.HISTOGRAM_FIELDS, stars) if n}
+                )
+                total = deltas.get(shard.movie_id, (0,) * len(cls.STARS))
+                deltas[shard.movie_id] = tuple(a + b for a, b in zip(total, stars))
+            return cls._apply_rating_deltas({pk: delta for pk, delta in deltas.items() if any(delta)})
+
     def recalc_ratings(self):
-        """Recompute ratings_count and ratings_avg from related Rating rows."""
-        agg = self.ratings.aggregate(avg=Avg("rating"), count=Count("id"))
-        avg = agg["avg"] or 0
-        count = agg["count"] or 0
-        # Round avg to 2 decimal places using Decimal
-        avg_decimal = (Decimal(avg).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-                       if count else Decimal("0.00"))
-        self.ratings_avg = avg_decimal
-        self.ratings_count = count
-        self.save(update_fields=["ratings_avg", "ratings_count"])
+        """Recompute the aggregates from scratch over all related Rating rows."""
+        with transaction.atomic(savepoint=False):
+            counts = dict(self.ratings.order_by().values_list("rating").annotate(n=Count("id")))
+            self.set_histogram(counts)
+            self.save(update_fields=list(self.AGGREGATE_FIELDS))
+            # the recount already includes whatever the shards were holding
+            self.rating_shards.all().delete()
+
+    def set_histogram(self, counts):
+        """Set the histogram and the count/sum/avg derived from it from {star: n}."""
+        for star, field in zip(self.STARS, self.HISTOGRAM_FIELDS):
+            setattr(self, field, counts.get(star, 0))
+        self.ratings_count, self.ratings_sum = self.histogram_from(counts)
+        self.ratings_avg = self.average_from(self.ratings_sum, self.ratings_count)
+
+
+class RankingPrior(models.Model):
+    """
+    Singleton holding the catalog-wide mean rating the leaderboard shrinks
+    towards. It is frozen between `rebuild_leaderboard` runs so incremental
+    score updates stay comparable with the rows they are ranked against.
+    """
+
+    mean = models.FloatField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    CACHE_KEY = "movies:leaderboard:prior"
+
+    @classmethod
+    def compute_mean(cls, movies=None):
+        totals = (movies if movies is not None else Movie.objects).aggregate(
+            total=Sum("ratings_sum"), count=Sum("ratings_count")
+        )
+        # midpoint of the 1-5 scale until there is anything to average
+        return totals["total"] / totals["count"] if totals["count"] else 3.0
+
+    @classmethod
+    def get_mean(cls):
+        cache = get_cache()
+        mean = cache.get(cls.CACHE_KEY)
+        if mean is None:
+            prior = cls.objects.filter(pk=1).first()
+            if prior is None:
+                prior, _ = cls.objects.get_or_create(pk=1, defaults={"mean": cls.compute_mean()})
+            mean = prior.mean
+            # short TTL: a rebuild in another process is picked up within it
+            cache.set(cls.CACHE_KEY, mean, 300)
+        return mean
+
+    @classmethod
+    def set_mean(cls, mean):
+        cls.objects.update_or_create(pk=1, defaults={"mean": mean})
+        get_cache().set(cls.CACHE_KEY, mean, 300)
+
+
+class MovieRanking(models.Model):
+    """
+    Leaderboard row per rated movie, ordered by an IMDb-style weighted score
+
+        score = (ratings_sum + m * C) / (ratings_count + m)
+
+    i.e. the movie's mean shrunk towards the catalog mean C by m phantom
+    votes (MOVIES_TOP_MIN_VOTES), so a single 5-star vote can't top the
+    chart. Rows are upserted by Movie.apply_rating_deltas in the rating's
+    transaction and read back by index, never by sorting Movie.
+    """
+
+    movie = models.OneToOneField(Movie, on_delete=models.CASCADE, primary_key=True, related_name="ranking")
+    score = models.FloatField()
+    votes = models.PositiveIntegerField()
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE, related_name="+", db_index=False)
+    decade = models.PositiveSmallIntegerField()
+
+    SOURCE_FIELDS = frozenset({"id", "genre", "release_year", "ratings_count", "ratings_sum"})
+
+    class Meta:
+        indexes = [
+            models.Index(F("score").desc(), "movie", name="ranking_score_idx"),
+            models.Index("genre", F("score").desc(), "movie", name="ranking_genre_score_idx"),
+            models.Index("decade", F("score").desc(), "movie", name="ranking_decade_score_idx"),
+        ]
+
+    @staticmethod
+    def min_votes():
+        return getattr(settings, "MOVIES_TOP_MIN_VOTES", 10)
+
+    @classmethod
+    def for_movie(cls, movie, mean, min_votes):
+        return cls(
+            movie_id=movie.pk,
+            score=(movie.ratings_sum + min_votes * mean) / (movie.ratings_count + min_votes),
+            votes=movie.ratings_count,
+            genre_id=movie.genre_id,
+            decade=movie.release_year // 10 * 10,
+        )
+
+    @classmethod
+    def sync(cls, movies, mean=None, batch_size=None):
+        """Upsert the rows for `movies`, dropping those left with no ratings."""
+        mean = RankingPrior.get_mean() if mean is None else mean
+        min_votes = cls.min_votes()
+        rows, unrated = [], []
+        for movie in movies:
+            if movie.ratings_count:
+                rows.append(cls.for_movie(movie, mean, min_votes))
+            else:
+                unrated.append(movie.pk)
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["movie"],
+                update_fields=["score", "votes", "genre", "decade"],
+            )
+        if unrated:
+            cls.objects.filter(movie_id__in=unrated).delete()
+
+
+class MovieNeighbor(models.Model):
+    """
+    Top-k item-item neighbors from co-ratings (adjusted cosine), written by
+    `build_recommendations` and read by the recommendations endpoint.
+    """
+
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="+")
+    similarity = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            # also the lookup index: a user's rated movies -> their neighbor lists
+            models.UniqueConstraint(fields=["movie", "neighbor"], name="movie_neighbor_unique"),
+        ]
+
+
+class SimilarMovie(models.Model):
+    """
+    Top-k content neighbors (description TF-IDF, genre, release year) per
+    movie, written by `build_similar_movies` and on movie creation.
+    """
+
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="similar_movies")
+    similar = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="+")
+    similarity = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["movie", "similar"], name="similar_movie_unique"),
+        ]
+        indexes = [
+            models.Index("movie", F("similarity").desc(), name="similar_movie_sim_idx"),
+        ]
+
+
+class MovieSearchIndex(models.Model):
+    """
+    The SQLite FTS5 index over movie title/description/genre. Triggers from
+    migrations 0003 and 0010 create and maintain it, not the ORM; it is
+    mapped only so ?search= can join it (see search.py).
+    """
+
+    movie = models.OneToOneField(
+        Movie, on_delete=models.DO_NOTHING, primary_key=True, db_column="rowid",
+        db_constraint=False, related_name="search_index",
+    )
+    # FTS5's hidden column named after the table: MATCH's left side and bm25()'s first argument
+    document = models.TextField(db_column="movies_movie_fts")
+
+    class Meta:
+        managed = False
+        db_table = "movies_movie_fts"
 
 
 class Rating(models.Model):
@@ -84,6 +461,174 @@ class Rating(models.Model):
     class Meta:
         unique_together = ("user", "movie")
         ordering = ["-created_at"]
+        indexes = [
+            # per-movie / per-user rating lists, newest first (id breaks ties for cursors)
+            models.Index(fields=["movie", "-created_at", "-id"], name="rating_movie_created_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="rating_user_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.movie.title} - {self.rating} by {self.user}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored value so save() can apply an old -> new delta
+        instance._loaded_rating = instance.__dict__.get("rating")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Instance-level saves keep Movie aggregates in step; queryset
+        # update()/bulk_create() bypass this, see rebuild_rating_aggregates.
+        # Deletes of any kind are handled by the receivers below.
+        old = None
+        if not self._state.adding:
+            old = getattr(self, "_loaded_rating", None)
+            if old is None:
+                old = Rating.objects.filter(pk=self.pk).values_list("rating", flat=True).first()
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            self._apply_to_movie(old=old, new=self.rating)
+        self._loaded_rating = self.rating
+
+    def _apply_to_movie(self, old=None, new=None):
+        # Refresh a cached movie in place; otherwise don't load it just to update it
+        if Rating.movie.is_cached(self):
+            self.movie.apply_rating_change(old=old, new=new)
+        else:
+            Movie.apply_rating_deltas({self.movie_id: Movie.rating_delta(old, new)})
+
+
+@receiver(post_delete, sender=Movie)
+def invalidate_deleted_movie(sender, instance, **kwargs):
+    # a receiver rather than Movie.delete() so cascades (e.g. a deleted user's movies) count too
+    bump_movie_versions(instance.pk)
+    bump_membership_version()
+
+
+def _deleted_with_movie(origin):
+    # the movie goes too, so there are no aggregates left to maintain
+    if isinstance(origin, Movie):
+        return True
+    return isinstance(origin, models.QuerySet) and origin.model is Movie
+
+
+@receiver(pre_delete, sender=Rating)
+def remember_deleted_rating(sender, instance, origin=None, **kwargs):
+    if _deleted_with_movie(origin):
+        return
+    # the stored value, not an unsaved edit; fetched if the row was loaded without it
+    old = getattr(instance, "_loaded_rating", None)
+    if old is None:
+        old = Rating.objects.filter(pk=instance.pk).values_list("rating", flat=True).first()
+    instance._deleted_rating = old
+
+
+@receiver(post_delete, sender=Rating)
+def apply_deleted_rating(sender, instance, origin=None, **kwargs):
+    """
+    Take a deleted rating out of its movie's aggregates. Django sends this
+    per row for Rating.delete(), QuerySet.delete() and cascades alike
+    (e.g. deleting a user), all inside the deleting transaction.
+    """
+    old = getattr(instance, "_deleted_rating", None)
+    if old is not None:
+        instance._apply_to_movie(old=old)
+
+
+class MovieRatingShard(models.Model):
+    """
+    One of MOVIES_RATING_SHARDS slices of a movie's not-yet-folded rating
+    changes: signed per-star deltas that Movie.fold_rating_shards() moves
+    into the Movie row. Spreading a hot movie's votes over several rows keeps
+    concurrent writers from queueing on the single Movie row lock.
+    """
+
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="rating_shards")
+    shard = models.PositiveSmallIntegerField()
+    # signed: an update or delete of a rating takes a star away
+    ratings_1 = models.IntegerField(default=0)
+    ratings_2 = models.IntegerField(default=0)
+    ratings_3 = models.IntegerField(default=0)
+    ratings_4 = models.IntegerField(default=0)
+    ratings_5 = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["movie", "shard"], name="rating_shard_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.movie_id}#{self.shard}"
+
+    def stars(self):
+        return tuple(getattr(self, field) for field in Movie.HISTOGRAM_FIELDS)
+
+    @classmethod
+    def add(cls, deltas, shards):
+        """
+        Add {movie_id: per-star deltas} to one randomly picked shard per movie.
+
+        Returns the ids whose shard was empty (new, or zeroed by a fold): they
+        need a fold queued. A shard already holding deltas was written since
+        the last fold, and that write queued one that hasn't folded it yet.
+        """
+        empty = {field: 0 for field in Movie.HISTOGRAM_FIELDS}
+        started = set()
+        for pk, stars in deltas.items():
+            shard = random.randrange(shards)
+            rows = cls.objects.filter(movie_id=pk, shard=shard)
+            updates = {field: F(field) + n for field, n in zip(Movie.HISTOGRAM_FIELDS, stars) if n}
+            if rows.exclude(**empty).update(**updates):
+                continue  # the common case on a hot movie
+            if not rows.filter(**empty).update(**updates):
+                # first write to this shard; folds leave the row behind so later writes are plain UPDATEs
+                cls.objects.bulk_create([cls(movie_id=pk, shard=shard)], ignore_conflicts=True)
+                rows.update(**updates)
+            started.add(pk)
+        return started
+
+
+class Task(models.Model):
+    """
+    A pending background job for `manage.py run_tasks` (see tasks.py).
+
+    (name, key) is unique, so enqueueing a job that is already pending is a
+    no-op: repeated requests to recompute the same movie coalesce into one
+    row until a worker claims it.
+    """
+
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100)
+    run_after = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["name", "key"], name="task_name_key_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["run_after"], name="task_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name}({self.key})"
+
+    @classmethod
+    def enqueue(cls, name, keys, delay=0):
+        """Queue `name` for every key in `keys` unless it is already pending."""
+        run_after = timezone.now() + timedelta(seconds=delay)
+        cls.objects.bulk_create(
+            [cls(name=name, key=str(key), run_after=run_after) for key in keys], ignore_conflicts=True
+        )
+
+
+class BlacklistedToken(models.Model):
+    """Refresh-token jti that has been rotated out; kept until the token would expire."""
+
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,139 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from .cache import get_cache, get_catalog_version
+
+
+# Custom pagination to match acceptance contract
+class ContractPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; `?cursor=` switches to keyset mode.
+
+    Keyset mode seeks on the view's `cursor_ordering` (e.g. ("-id",) or
+    ("-created_at", "-id")), so every page costs the same indexed range scan
+    instead of an OFFSET that grows with depth. `total` is counted once on the
+    first cursor page and cached; deeper pages read it from the cache (or
+    return null) instead of re-running COUNT(*).
+    """
+    page_size = 10
+    page_query_param = "page"
+    page_size_query_param = "limit"  # allow ?limit=10
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    default_cursor_ordering = ("-id",)
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_page_size(request) or self.page_size
+        self.ordering = tuple(getattr(view, "cursor_ordering", self.default_cursor_ordering))
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        self.total = self._get_total(queryset, first_page=not cursor)
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(self.decode_cursor(cursor, queryset.model)))
+
+        rows = list(queryset[: self.limit + 1])
+        has_next = len(rows) > self.limit
+        rows = rows[: self.limit]
+        self.next_cursor = self.encode_cursor(rows[-1]) if has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if getattr(self, "cursor_mode", False):
+            return Response(
+                {
+                    "items": data,
+                    "limit": int(self.limit),
+                    "next_cursor": self.next_cursor,
+                    "total": self.total,
+                }
+            )
+
+        # Build contract: { items: [...], page: x, limit: y, total: z }
+        page = self.page.number if self.page else 1
+        limit = self.get_page_size(self.request) or self.page_size
+        total = self.page.paginator.count if self.page else 0
+        return Response(
+            {
+                "items": data,
+                "page": page,
+                "limit": int(limit),
+                "total": total,
+            }
+        )
+
+    def _fields(self):
+        return [name.lstrip("-") for name in self.ordering]
+
+    def encode_cursor(self, obj):
+        values = []
+        for name in self._fields():
+            value = getattr(obj, name)
+            values.append(value.isoformat() if isinstance(value, datetime) else value)
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor, model):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        decoded = []
+        for name, value in zip(self._fields(), values):
+            # each value goes through its ordering field, so a well-formed
+            # cursor with the wrong types can't reach the seek lookup
+            if value is None or isinstance(value, (dict, list, bool)):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                decoded.append(model._meta.get_field(name).to_python(value))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+        return decoded
+
+    def seek_filter(self, values):
+        # Lexicographic "row comes after the cursor" for mixed asc/desc keys:
+        # (a > va) OR (a = va AND b > vb) OR ...
+        condition = Q(pk__in=[])
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def total_cache_key(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        # keyed on the catalog version so creates/deletes/votes drop stale totals
+        raw = f"{sql}|{params!r}|{get_catalog_version()}"
+        return "contract-total:" + hashlib.sha1(raw.encode()).hexdigest()
+
+    def _get_total(self, queryset, first_page):
+        cache = get_cache()
+        key = self.total_cache_key(queryset)
+        total = cache.get(key)
+        if total is None and first_page:
+            total = queryset.order_by().count()
+            cache.set(key, total, self.total_ttl())
+        return total
+
+    def total_ttl(self):
+        return getattr(settings, "CONTRACT_PAGINATION_TOTAL_TTL", 60)
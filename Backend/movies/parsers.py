@@ -0,0 +1,30 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse newline-delimited JSON lazily.
+
+    Returns a generator over the decoded lines, so a bulk upload is consumed
+    batch by batch straight from the request stream instead of being loaded
+    into memory as one document.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+
+        def rows():
+            for lineno, line in enumerate(stream, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line.decode(encoding))
+                except ValueError as exc:
+                    raise ParseError(f"NDJSON parse error on line {lineno}: {exc}")
+
+        return rows()
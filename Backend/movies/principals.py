@@ -0,0 +1,141 @@
+"""
+Per-process cache of authenticated users, keyed on the token's user id.
+
+JWTAuthentication otherwise runs a User SELECT on every authenticated
+request. Entries live in a bounded LRU with a TTL; with
+MOVIES_PRINCIPAL_CACHE_ALIAS set, misses fall through to that shared cache
+before the database so a fleet of workers warms up once.
+
+A User save or delete drops the entry here and in the shared cache, which
+also covers is_active and password changes. Other processes only see that
+once their local TTL runs out, so keep MOVIES_PRINCIPAL_CACHE_TTL short.
+QuerySet.update() on users sends no signals and isn't caught.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+def principal_key(user_id):
+    return f"movies:principal:{user_id}"
+
+
+class PrincipalCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def max_entries(self):
+        return getattr(settings, "MOVIES_PRINCIPAL_CACHE_SIZE", 10_000)
+
+    @property
+    def ttl(self):
+        return getattr(settings, "MOVIES_PRINCIPAL_CACHE_TTL", 60)
+
+    @property
+    def shared(self):
+        alias = getattr(settings, "MOVIES_PRINCIPAL_CACHE_ALIAS", None)
+        return caches[alias] if alias else None
+
+    def reset_stats(self):
+        self.hits = self.shared_hits = self.misses = self.invalidations = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def _get_local(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                expires, user = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    # callers may mutate request.user; never hand out the cached instance
+                    return copy.copy(user)
+                del self._entries[user_id]
+        return None
+
+    def _set_local(self, user_id, user):
+        user_id = str(user_id)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _from_shared(self, user_id, user):
+        if user is None:
+            self.misses += 1
+            return None
+        self.shared_hits += 1
+        self._set_local(user_id, user)
+        return user
+
+    def get(self, user_id):
+        user = self._get_local(user_id)
+        if user is not None:
+            return user
+        shared = self.shared
+        return self._from_shared(user_id, shared.get(principal_key(user_id)) if shared else None)
+
+    async def aget(self, user_id):
+        user = self._get_local(user_id)
+        if user is not None:
+            return user
+        shared = self.shared
+        return self._from_shared(user_id, await shared.aget(principal_key(user_id)) if shared else None)
+
+    def set(self, user_id, user):
+        self._set_local(user_id, user)
+        if self.shared:
+            self.shared.set(principal_key(user_id), user, self.ttl)
+
+    async def aset(self, user_id, user):
+        self._set_local(user_id, user)
+        if self.shared:
+            await self.shared.aset(principal_key(user_id), user, self.ttl)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+        if self.shared:
+            self.shared.delete(principal_key(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_principal(sender, instance, **kwargs):
+    # Drop it now for this transaction, and again after commit in case a
+    # concurrent request re-cached the pre-commit row in between.
+    user_id = instance.pk
+    principal_cache.invalidate(user_id)
+    transaction.on_commit(lambda: principal_cache.invalidate(user_id))
@@ -0,0 +1,131 @@
+"""
+Item-based collaborative filtering.
+
+build_neighbors() streams the Rating table into a sparse user x movie matrix
+of user-mean-centred ratings and computes adjusted-cosine item-item
+similarities with sparse matrix products, one block of movies at a time so
+memory stays bounded at millions of ratings. Each similarity is shrunk by
+its co-rater count, n / (n + shrinkage), so a pair rated together by two
+people can't outrank one rated together by two hundred. The top-k positive
+neighbors per movie are stored in MovieNeighbor.
+
+recommend() then scores a user's unrated movies from their own ratings and
+those stored lists; the request path does no matrix work.
+"""
+import heapq
+from array import array
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+
+from .models import MovieNeighbor, Rating
+
+# Ratings above this pull neighbors up when a user's ratings have no spread
+NEUTRAL_RATING = 3
+
+
+def load_ratings(queryset=None, chunk_size=100_000):
+    """(user_ids, movie_ids, stars) arrays streamed from `queryset` (default: every Rating)."""
+    queryset = Rating.objects.all() if queryset is None else queryset
+    users, movies, stars = array("q"), array("q"), array("b")
+    rows = queryset.order_by().values_list("user_id", "movie_id", "rating").iterator(chunk_size=chunk_size)
+    for user_id, movie_id, rating in rows:
+        users.append(user_id)
+        movies.append(movie_id)
+        stars.append(rating)
+    return np.frombuffer(users, dtype=np.int64), np.frombuffer(movies, dtype=np.int64), np.frombuffer(stars, dtype=np.int8)
+
+
+def rating_matrices(users, movies, stars):
+    """
+    Return (movie_ids, X, B): X holds mean-centred ratings with unit-norm
+    movie columns, B is the 0/1 rated pattern, both users x movies CSC.
+    """
+    user_ids, u = np.unique(users, return_inverse=True)
+    movie_ids, m = np.unique(movies, return_inverse=True)
+    shape = (len(user_ids), len(movie_ids))
+    stars = stars.astype(np.float32)
+    means = np.bincount(u, weights=stars) / np.bincount(u)
+    centred = (stars - means[u]).astype(np.float32)
+
+    X = sparse.csc_matrix((centred, (u, m)), shape=shape, dtype=np.float32)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=0)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    X = (X @ sparse.diags(inverse.astype(np.float32))).tocsc()
+    B = sparse.csc_matrix((np.ones_like(centred), (u, m)), shape=shape, dtype=np.float32)
+    return movie_ids, X, B
+
+
+def build_neighbors(ratings, k=30, shrinkage=10.0, block_size=512, only_movies=None):
+    """
+    {movie_id: [(neighbor_id, similarity), ...]} best first, for every movie
+    in `ratings` (user_ids, movie_ids, stars) or just `only_movies`.
+    """
+    movie_ids, X, B = rating_matrices(*ratings)
+    if not len(movie_ids):
+        return {}
+    XT, BT = X.T.tocsr(), B.T.tocsr()
+    if only_movies is None:
+        targets = np.arange(len(movie_ids))
+    else:
+        targets = np.flatnonzero(np.isin(movie_ids, list(only_movies)))
+
+    neighbors = {}
+    for start in range(0, len(targets), block_size):
+        block = targets[start:start + block_size]
+        sims = (XT[block] @ X).toarray()
+        if shrinkage:
+            counts = (BT[block] @ B).toarray()
+            sims *= counts / (counts + shrinkage)
+        neighbors.update(top_neighbors(sims, block, movie_ids, k))
+    return neighbors
+
+
+def top_neighbors(sims, block, ids, k):
+    """
+    Pick the k best positive columns of each row of the dense `sims` block,
+    whose rows are the columns `block`; returns {ids[row]: [(id, sim), ...]}.
+    """
+    sims[np.arange(len(block)), block] = 0  # a movie is not its own neighbor
+    keep = min(k, sims.shape[1] - 1)
+    if keep <= 0:
+        return {int(ids[target]): [] for target in block}
+    top = np.argpartition(-sims, keep - 1, axis=1)[:, :keep]
+    top_sims = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-top_sims, axis=1, kind="stable")
+    top, top_sims = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_sims, order, axis=1)
+    top_ids = ids[top]
+    result = {}
+    for row, target in enumerate(block):
+        positive = top_sims[row] > 0
+        result[int(ids[target])] = list(zip(top_ids[row][positive].tolist(), top_sims[row][positive].tolist()))
+    return result
+
+
+def recommend(user_id, limit=20, history=200):
+    """
+    [(movie_id, score), ...] best first for `user_id`, excluding movies they
+    have rated. Their `history` most recent ratings vote for each neighbor
+    with weight similarity x (rating - their mean).
+    """
+    rated = list(
+        Rating.objects.filter(user_id=user_id)
+        .order_by("-created_at", "-id")
+        .values_list("movie_id", "rating")
+    )
+    if not rated:
+        return []
+    recent = rated[:history]
+    mean = sum(rating for _, rating in recent) / len(recent)
+    baseline = mean if any(rating != mean for _, rating in recent) else NEUTRAL_RATING
+    weights = {movie_id: rating - baseline for movie_id, rating in recent}
+    seen = {movie_id for movie_id, _ in rated}
+
+    scores = defaultdict(float)
+    pairs = MovieNeighbor.objects.filter(movie_id__in=weights).values_list("movie_id", "neighbor_id", "similarity")
+    for movie_id, neighbor_id, similarity in pairs:
+        if neighbor_id not in seen:
+            scores[neighbor_id] += similarity * weights[movie_id]
+    best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+    return [(movie_id, score) for movie_id, score in best if score > 0]
@@ -0,0 +1,179 @@
+"""
+Read-only serialization straight from `values_list()` tuples.
+
+RowSerializer.for_serializer() compiles a DRF serializer's fields into one
+accessor per output field: a tuple index for plain columns, precompiled
+formatters for decimals and datetimes, and the field's own
+to_representation() for anything else, so rows come out exactly as the
+serializer would produce them without building model instances or walking
+DRF field objects per row. Serializers opt in with a
+`row_sources` map for fields not read from a same-named column.
+"""
+import decimal
+from functools import lru_cache
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation() returns the column value unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.SerializerMethodField,
+)
+
+
+class RowSerializer:
+    def __init__(self, fields, sources=None, converters=None):
+        self.fields = tuple(fields)
+        # output name -> ORM lookup, e.g. {"user": "user__username"}, or a
+        # {key: lookup} dict to nest several columns under one output field
+        self.sources = []
+        self._getters = []
+        for name in self.fields:
+            source = (sources or {}).get(name, name)
+            if isinstance(source, dict):
+                self._getters.append(self._nested({key: self._column(lookup) for key, lookup in source.items()}))
+            else:
+                self._getters.append(self._getter(self._column(source), (converters or {}).get(name)))
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None, tz=None):
+        """
+        Compile `serializer_class` (or just `fields` of it); datetimes are
+        rendered in `tz`, by default the current time zone.
+        """
+        fields = serializer_class.Meta.fields if fields is None else fields
+        tz = timezone.get_current_timezone() if tz is None else tz
+        sources = getattr(serializer_class, "row_sources", {})
+        declared = serializer_class().fields
+        converters = {}
+        for name in fields:
+            field = declared[name]
+            if isinstance(field, serializers.SerializerMethodField) and name not in sources:
+                raise ImproperlyConfigured(f"{serializer_class.__name__}.row_sources has no column for {name!r}")
+            if isinstance(field, serializers.DateTimeField):
+                converters[name] = datetime_converter(field, tz)
+            elif isinstance(field, serializers.DecimalField):
+                converters[name] = decimal_converter(field)
+            elif not isinstance(field, PASSTHROUGH_FIELDS):
+                converters[name] = field.to_representation
+        return cls(fields, sources, converters)
+
+    def _column(self, lookup):
+        if lookup not in self.sources:
+            self.sources.append(lookup)
+        return self.sources.index(lookup)
+
+    @staticmethod
+    def _getter(index, convert):
+        if convert is None:
+            return itemgetter(index)
+
+        def get(values):
+            # DRF skips to_representation() for None too
+            value = values[index]
+            return None if value is None else convert(value)
+
+        return get
+
+    @staticmethod
+    def _nested(columns):
+        items = tuple(columns.items())
+        return lambda values: {key: values[index] for key, index in items}
+
+    def values(self, queryset, extra=()):
+        """
+        values_list() of `queryset` with the columns this serializer reads,
+        plus `extra` ones (e.g. cursor keys), as named rows.
+        """
+        columns = self.sources + [name for name in extra if name not in self.sources]
+        return queryset.values_list(*columns, named=True)
+
+    def format(self, values):
+        return [get(values) for get in self._getters]
+
+    def data(self, rows):
+        fields, getters = self.fields, self._getters
+        return [{name: get(values) for name, get in zip(fields, getters)} for values in rows]
+
+    def rows(self, queryset, chunk_size=2000):
+        for values in queryset.values_list(*self.sources).iterator(chunk_size=chunk_size):
+            yield self.format(values)
+
+
+def datetime_converter(field, tz):
+    """
+    DateTimeField.to_representation() for the default ISO 8601 output of
+    aware datetimes, with the time zone resolved up front instead of on
+    every call.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, "timezone") or not settings.USE_TZ:
+        return field.to_representation
+
+    convert_zone = str(tz) != "UTC"
+
+    def convert(value):
+        # database values already come back in UTC; only convert for other zones
+        if convert_zone or value.utcoffset():
+            value = value.astimezone(tz)
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return convert
+
+
+def row_serializer(serializer_class, fields=None):
+    """RowSerializer for `serializer_class` in the current time zone, compiled once."""
+    return _compiled(serializer_class, fields, timezone.get_current_timezone())
+
+
+def decimal_converter(field):
+    """DecimalField.to_representation() for string output, with the quantize context built once."""
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            return field.to_representation(value)
+        return f"{value.quantize(exponent, rounding=rounding, context=context):f}"
+
+    return convert
+
+
+@lru_cache(maxsize=256)
+def _compiled(serializer_class, fields, tz):
+    return RowSerializer.for_serializer(serializer_class, fields, tz)
+
+
+class RowListMixin:
+    """
+    List GETs served from values_list() rows through the view's serializer
+    compiled by row_serializer(), honouring SparseFieldsetMixin's ?fields=.
+    The pk and `cursor_ordering` columns are always selected so both
+    pagination modes work on the rows.
+    """
+
+    def list(self, request, *args, **kwargs):
+        rows = row_serializer(self.get_serializer_class(), self.get_sparse_fields())
+        keys = ["id", *(name.lstrip("-") for name in getattr(self, "cursor_ordering", ()))]
+        queryset = rows.values(self.filter_queryset(self.get_queryset()), extra=keys)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(rows.data(queryset))
+        return self.get_paginated_response(rows.data(page))
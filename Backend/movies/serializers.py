@@ -1,11 +1,26 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
-from .models import Movie, Rating
+from .models import Genre, Movie, Rating
 from drf_spectacular.utils import extend_schema_serializer, OpenApiExample, extend_schema_field
 from rest_framework.exceptions import AuthenticationFailed
+from .fieldsets import SparseFieldsMixin
 
 User = get_user_model()
 
+
+def clean_rating_value(value):
+    """Coerce a submitted star rating to int, enforcing the 1-5 range."""
+    if value is None:
+        raise serializers.ValidationError("rating is required")
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError("rating must be an integer between 1 and 5")
+    if value < 1 or value > 5:
+        raise serializers.ValidationError("rating must be between 1 and 5")
+    return value
+
+
 @extend_schema_serializer(
     examples=[
         OpenApiExample(
@@ -45,6 +60,12 @@ class LoginSerializer(serializers.Serializer):
             raise AuthenticationFailed("Invalid credentials")
         return user
 
+class GenreField(serializers.CharField):
+    """A movie's genre by name; MovieSerializer resolves the Genre row on save."""
+
+    def to_representation(self, value):
+        return value.name if isinstance(value, Genre) else value
+
 @extend_schema_serializer(
     examples=[
         OpenApiExample(
@@ -58,13 +79,16 @@ class LoginSerializer(serializers.Serializer):
                 "created_by": 1,
                 "average_rating": 4.5,
                 "ratings_count": 12,
+                "ratings_histogram": {"1": 0, "2": 1, "3": 1, "4": 2, "5": 8},
             },
         )
     ]
 )
-class MovieSerializer(serializers.ModelSerializer):
+class MovieSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    genre = GenreField(max_length=100)
     ratings_avg = serializers.DecimalField(max_digits=4, decimal_places=2, read_only=True)
     ratings_count = serializers.IntegerField(read_only=True)
+    ratings_histogram = serializers.SerializerMethodField(read_only=True)
     created_by = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -78,14 +102,62 @@ class MovieSerializer(serializers.ModelSerializer):
             "created_by",
             "ratings_avg",
             "ratings_count",
+            "ratings_histogram",
             "created_at",
         )
-        read_only_fields = ("id", "created_by", "ratings_avg", "ratings_count", "created_at")
+        read_only_fields = ("id", "created_by", "ratings_avg", "ratings_count", "ratings_histogram", "created_at")
+
+    # columns behind the method fields, for .only() and RowSerializer
+    row_sources = {
+        "genre": "genre__name",
+        "created_by": "created_by_id",
+        "ratings_histogram": {str(star): field for star, field in zip(Movie.STARS, Movie.HISTOGRAM_FIELDS)},
+    }
+
+    def create(self, validated_data):
+        validated_data["genre"] = Genre.resolve(validated_data["genre"])
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        if "genre" in validated_data:
+            validated_data["genre"] = Genre.resolve(validated_data["genre"])
+        return super().update(instance, validated_data)
 
     @extend_schema_field(serializers.IntegerField)
     def get_created_by(self, obj):
-        # Return user id for created_by
-        return getattr(obj.created_by, "id", None)
+        # Return user id for created_by (the FK column, no User fetch)
+        return obj.created_by_id
+
+    @extend_schema_field(serializers.DictField(child=serializers.IntegerField()))
+    def get_ratings_histogram(self, obj):
+        # {"1": n, ..., "5": n} from the denormalized counters
+        return {str(star): getattr(obj, field) for star, field in zip(Movie.STARS, Movie.HISTOGRAM_FIELDS)}
+
+class PersonalMovieSerializer(MovieSerializer):
+    # the requesting user's stars, annotated by MyRatingMixin; None if unrated
+    my_rating = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta(MovieSerializer.Meta):
+        fields = MovieSerializer.Meta.fields + ("my_rating",)
+
+class RecommendedMovieSerializer(MovieSerializer):
+    # None for titles filled in from the leaderboard when neighbors run out
+    score = serializers.FloatField(source="recommendation_score", read_only=True, allow_null=True)
+
+    class Meta(MovieSerializer.Meta):
+        fields = MovieSerializer.Meta.fields + ("score",)
+
+class SimilarMovieSerializer(MovieSerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(MovieSerializer.Meta):
+        fields = MovieSerializer.Meta.fields + ("similarity",)
+
+class TopMovieSerializer(MovieSerializer):
+    score = serializers.DecimalField(source="ranking.score", max_digits=5, decimal_places=3, read_only=True)
+
+    class Meta(MovieSerializer.Meta):
+        fields = MovieSerializer.Meta.fields + ("score",)
 
 @extend_schema_serializer(
     examples=[
@@ -103,7 +175,7 @@ class MovieSerializer(serializers.ModelSerializer):
         )
     ]
 )
-class RatingSerializer(serializers.ModelSerializer):
+class RatingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -111,6 +183,8 @@ class RatingSerializer(serializers.ModelSerializer):
         fields = ("id", "user", "movie", "rating", "review", "created_at", "updated_at")
         read_only_fields = ("id", "user", "movie", "created_at", "updated_at")
 
+    row_sources = {"user": "user__username", "movie": "movie_id"}
+
     @extend_schema_field(serializers.CharField)
     def get_user(self, obj):
         # present username in response
@@ -122,12 +196,31 @@ class RatingSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Rating must be an integer between 1 and 5.")
         return value
 
+class BulkRatingRowSerializer(serializers.Serializer):
+    movie = serializers.IntegerField()
+    rating = serializers.JSONField()
+    review = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_rating(self, value):
+        return clean_rating_value(value)
+
 class TokenResponseSerializer(serializers.Serializer):
     access_token = serializers.CharField()
+    refresh_token = serializers.CharField()
     token_type = serializers.CharField()
 
+class TokenRefreshSerializer(serializers.Serializer):
+    refresh_token = serializers.CharField()
+
 class MovieListResponseSerializer(serializers.Serializer):
     items = MovieSerializer(many=True)
     page = serializers.IntegerField()
     limit = serializers.IntegerField()
-    total = serializers.IntegerField()
\ No newline at end of file
+    total = serializers.IntegerField()
+
+class MovieBatchRequestSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField())
+
+class MovieBatchResponseSerializer(serializers.Serializer):
+    items = MovieSerializer(many=True)
+    missing = serializers.ListField(child=serializers.IntegerField())
@@ -0,0 +1,194 @@
+"""
+Content-based "similar movies".
+
+Each pair's similarity blends three features already on Movie:
+
+    TEXT_WEIGHT  * cosine of the description TF-IDF vectors
+  + GENRE_WEIGHT * 1 if the genres match
+  + YEAR_WEIGHT  * exp(-|year difference| / YEAR_SCALE)
+
+computed for a block of movies against the whole catalog with sparse/dense
+matrix products; the top-k per movie are stored in SimilarMovie.
+
+`build_similar_movies` recomputes every list. A created movie's own list is
+computed by a queued task (refresh_similar, run by `manage.py run_tasks`)
+against catalog_features, which keeps the fitted vocabulary/idf in process
+and only transforms movies added since the last fit.
+"""
+import re
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from .models import Movie, SimilarMovie
+from .recommender import top_neighbors
+
+TEXT_WEIGHT = 0.6
+GENRE_WEIGHT = 0.25
+YEAR_WEIGHT = 0.15
+YEAR_SCALE = 10.0
+
+TOKEN_RE = re.compile(r"[^\W\d_]{2,}")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def term_counts(documents, vocabulary, grow=True):
+    """(rows, cols, counts) of each document's tokens; unknown tokens are added or, without `grow`, dropped."""
+    rows, cols, counts = [], [], []
+    for row, text in enumerate(documents):
+        for token, count in Counter(tokenize(text)).items():
+            col = vocabulary.setdefault(token, len(vocabulary)) if grow else vocabulary.get(token)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+                counts.append(count)
+    return rows, cols, counts
+
+
+def fit_tfidf(documents):
+    """(vocabulary, idf): token -> column and the smoothed idf of every column."""
+    vocabulary = {}
+    _, cols, _ = term_counts(documents, vocabulary)
+    df = np.bincount(np.asarray(cols, dtype=np.int64), minlength=max(len(vocabulary), 1))
+    idf = (np.log((1 + len(documents)) / (1 + df)) + 1).astype(np.float32)
+    return vocabulary, idf
+
+
+def tfidf_matrix(documents, vocabulary=None, idf=None):
+    """
+    L2-normalised TF-IDF rows (smoothed idf, sublinear tf) as CSR, fitted on
+    `documents` unless a fitted vocabulary and idf are passed in.
+    """
+    if vocabulary is None:
+        vocabulary, idf = fit_tfidf(documents)
+    rows, cols, counts = term_counts(documents, vocabulary, grow=False)
+    shape = (len(documents), len(idf))
+    tf = sparse.csr_matrix(
+        (1 + np.log(np.asarray(counts, dtype=np.float32)), (rows, cols)), shape=shape, dtype=np.float32
+    )
+    weighted = (tf @ sparse.diags(idf)).tocsr()
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return (sparse.diags(inverse) @ weighted).tocsr()
+
+
+def movie_features(movies=None, vocabulary=None, idf=None):
+    """(movie_ids, tfidf, genre ids, release years) for every movie in id order."""
+    movies = Movie.objects.all() if movies is None else movies
+    rows = list(movies.order_by("id").values_list("id", "genre_id", "release_year", "description"))
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    genre_codes = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+    years = np.fromiter((row[2] for row in rows), dtype=np.float32, count=len(rows))
+    return ids, tfidf_matrix([row[3] for row in rows], vocabulary, idf), genre_codes, years
+
+
+class CatalogFeatures:
+    """
+    movie_features() of the whole catalog, refitted at most every
+    MOVIES_SIMILAR_REFIT seconds. In between, movies with a higher id than
+    any seen are transformed with the fitted vocabulary/idf and appended, so
+    a refresh reads only the new rows. Edits and deletes since the fit show
+    up at the next one (refresh_similar drops deleted neighbors).
+    """
+
+    def __init__(self):
+        self._features = None
+        self._vocabulary = self._idf = None
+        self._fitted_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def refit_interval(self):
+        return getattr(settings, "MOVIES_SIMILAR_REFIT", 3600)
+
+    def get(self, movie_id=None):
+        """The features, refitted if stale or if `movie_id` is still missing from them."""
+        with self._lock:
+            if self._fitted_at is None or time.monotonic() - self._fitted_at > self.refit_interval:
+                self._fit()
+            else:
+                self._extend()
+                if movie_id is not None and movie_id not in self._features[0]:
+                    self._fit()  # not a new id (e.g. the database was reset); start over
+            return self._features
+
+    def _fit(self):
+        self._vocabulary, self._idf = fit_tfidf(list(Movie.objects.values_list("description", flat=True)))
+        self._features = movie_features(vocabulary=self._vocabulary, idf=self._idf)
+        self._fitted_at = time.monotonic()
+
+    def _extend(self):
+        ids, text, genres, years = self._features
+        newer = Movie.objects.filter(pk__gt=ids[-1]) if len(ids) else Movie.objects.all()
+        added = movie_features(newer, vocabulary=self._vocabulary, idf=self._idf)
+        if len(added[0]):
+            self._features = (
+                np.concatenate([ids, added[0]]), sparse.vstack([text, added[1]]).tocsr(),
+                np.concatenate([genres, added[2]]), np.concatenate([years, added[3]]),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._features = self._vocabulary = self._idf = None
+            self._fitted_at = None
+
+
+catalog_features = CatalogFeatures()
+
+
+def build_similar(features, k=20, block_size=512, only_movies=None):
+    """{movie_id: [(similar_id, similarity), ...]} best first for all movies or `only_movies`."""
+    ids, text, genres, years = features
+    if not len(ids):
+        return {}
+    if only_movies is None:
+        targets = np.arange(len(ids))
+    else:
+        targets = np.flatnonzero(np.isin(ids, list(only_movies)))
+    text_t = text.T.tocsc()
+
+    similar = {}
+    for start in range(0, len(targets), block_size):
+        block = targets[start:start + block_size]
+        sims = TEXT_WEIGHT * (text[block] @ text_t).toarray()
+        sims += GENRE_WEIGHT * (genres[block][:, None] == genres[None, :])
+        sims += YEAR_WEIGHT * np.exp(-np.abs(years[block][:, None] - years[None, :]) / YEAR_SCALE)
+        similar.update(top_neighbors(sims, block, ids, k))
+    return similar
+
+
+def store_similar(similar, replace_all=False):
+    """Replace the SimilarMovie rows of every movie in `similar` (or the whole table)."""
+    stale = SimilarMovie.objects.all()
+    if not replace_all:
+        stale = stale.filter(movie_id__in=list(similar))
+    stale.delete()
+    SimilarMovie.objects.bulk_create(
+        [
+            SimilarMovie(movie_id=movie_id, similar_id=similar_id, similarity=similarity)
+            for movie_id, pairs in similar.items()
+            for similar_id, similarity in pairs
+        ],
+        batch_size=5000,
+    )
+
+
+def refresh_similar(movie_id, k=20):
+    """Recompute one movie's neighbors, e.g. right after it is created."""
+    similar = build_similar(catalog_features.get(movie_id), k=k, only_movies=[movie_id])
+    candidates = {movie_id} | {similar_id for pairs in similar.values() for similar_id, _ in pairs}
+    with transaction.atomic():
+        live = set(Movie.objects.filter(pk__in=candidates).values_list("pk", flat=True))
+        store_similar({
+            pk: [(similar_id, similarity) for similar_id, similarity in pairs if similar_id in live]
+            for pk, pairs in similar.items() if pk in live
+        })
+
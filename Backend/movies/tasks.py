@@ -0,0 +1,88 @@
+"""
+Database-backed background tasks, run by `python manage.py run_tasks`.
+
+Task rows are the queue, so no broker is needed. Task.enqueue() skips a
+(name, key) that is already pending, which coalesces bursts: ten thousand
+votes on one movie within MOVIES_AGGREGATE_DELAY leave a single
+"recompute movie X" row behind. The same goes for folds of a movie's
+sharded rating counters (MOVIES_RATING_SHARDS).
+
+A worker claims a task by deleting its row in the same transaction as the
+handler runs in. Only one worker's DELETE can match, an enqueue that arrives
+after the claim commits creates a fresh row, and if the handler raises or
+the worker dies mid-run the rollback puts the row back. A failing task is
+retried with backoff up to MAX_ATTEMPTS times, then dropped and logged.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Movie, Task
+from .similarity import refresh_similar
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 5  # seconds, doubled per attempt
+
+HANDLERS = {}
+
+
+def task(name):
+    """Register the decorated function as the handler for `name`; it gets the task key."""
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+@task(Movie.AGGREGATE_TASK)
+def recompute_aggregates(key):
+    movie = Movie.objects.filter(pk=key).first()
+    if movie is not None:  # deleted since the vote
+        movie.recalc_ratings()
+
+
+@task(Movie.FOLD_TASK)
+def fold_rating_shards(key):
+    Movie.fold_rating_shards([int(key)])
+
+
+@task(Movie.SIMILAR_TASK)
+def refresh_similar_movies(key):
+    refresh_similar(int(key))
+
+
+def run_due(limit=100, now=None):
+    """Claim and run up to `limit` due tasks, oldest first; returns (ran, failed)."""
+    now = timezone.now() if now is None else now
+    ran = failed = 0
+    for pending in Task.objects.filter(run_after__lte=now).order_by("run_after", "id")[:limit]:
+        try:
+            with transaction.atomic():
+                deleted, _ = Task.objects.filter(pk=pending.pk).delete()
+                if not deleted:
+                    continue  # another worker claimed it
+                ran += 1
+                HANDLERS[pending.name](pending.key)
+        except Exception as exc:
+            failed += 1
+            retry(pending, exc)
+    return ran, failed
+
+
+def retry(pending, exc):
+    """Back off the task's row, which the failed run's rollback restored, or drop it for good."""
+    attempts = pending.attempts + 1
+    row = Task.objects.filter(pk=pending.pk)
+    if attempts >= MAX_ATTEMPTS:
+        logger.error("Dropping %s after %d attempts", pending, attempts, exc_info=exc)
+        row.delete()
+        return
+    logger.warning("%s failed (attempt %d), retrying", pending, attempts, exc_info=exc)
+    row.update(
+        attempts=attempts, last_error=repr(exc),
+        run_after=timezone.now() + timedelta(seconds=RETRY_DELAY * 2 ** (attempts - 1)),
+    )
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin pinning how many SQL queries an endpoint may run.
+
+    assertQueryBudget() GETs the URL once per page size and fails if any
+    request exceeds the budget or if the count changes with the page size,
+    which is how an N+1 shows up. The cache is cleared before each request
+    so the budget measures the database path, not a cached response.
+    """
+
+    def assertQueryBudget(self, url, budget, page_sizes=(1, 50), **extra):
+        counts = {}
+        for size in page_sizes:
+            separator = "&" if "?" in url else "?"
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(f"{url}{separator}limit={size}", **extra)
+            self.assertLess(resp.status_code, 400, f"{url} returned {resp.status_code}")
+            counts[size] = len(ctx.captured_queries)
+            self.assertLessEqual(
+                counts[size],
+                budget,
+                f"{url}?limit={size} ran {counts[size]} queries (budget {budget}):\n"
+                + "\n".join(q["sql"] for q in ctx.captured_queries),
+            )
+        self.assertEqual(len(set(counts.values())), 1, f"{url} query count depends on page size: {counts}")
@@ -2,17 +2,46 @@ from django.test import TestCase
 
 # Create your tests here.
 
+import asyncio
+import base64
+import itertools
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from rest_framework.mixins import ListModelMixin
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from .models import Movie, Rating
+from .models import BlacklistedToken, Genre, Movie, MovieNeighbor, MovieRanking, MovieRatingShard, RankingPrior, Rating, Task
+from .principals import principal_cache
+from .renderers import FastJSONRenderer
+from .tasks import run_due
+from .rows import RowListMixin
+from .similarity import catalog_features
+from .tokens import token_blacklist
+from .testing import QueryBudgetMixin
+from .views import upsert_rating
 
 User = get_user_model()
 
 
 class MoviesAPITest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.register_url = "/api/auth/register/"
         self.login_url = "/api/auth/login/"
         self.movies_url = "/api/movies/"
@@ -43,6 +72,7 @@ class MoviesAPITest(APITestCase):
         resp = self.client.post(self.login_url, data, format="json")
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIn("access_token", resp.data)
+        self.assertIn("refresh_token", resp.data)
         self.assertEqual(resp.data["token_type"], "bearer")
 
     def test_create_movie_requires_auth_and_returns_201(self):
@@ -83,6 +113,17 @@ class MoviesAPITest(APITestCase):
         self.assertEqual(rate_resp2.data["movie"]["ratings_count"], 1)
         self.assertEqual(str(rate_resp2.data["movie"]["ratings_avg"]), "4.00")
 
+    def test_losing_a_first_vote_race_updates_the_winning_row(self):
+        movie = Movie.objects.create(title="Race", genre="Drama", release_year=2001, created_by=self.user)
+        Rating.objects.create(user=self.user, movie=movie, rating=2)
+        # the row is inserted by a concurrent request after our lookup found nothing
+        with patch("django.db.models.query.QuerySet.first", return_value=None):
+            rating_obj, created = upsert_rating(self.user, movie, 5, "changed my mind")
+        self.assertFalse(created)
+        self.assertEqual(Rating.objects.get(user=self.user, movie=movie).rating, 5)
+        movie.refresh_from_db()
+        self.assertEqual((movie.ratings_count, movie.ratings_sum), (1, 5))
+
     def test_list_movies_pagination_contract(self):
         # create several movies
         login = self.client.post(self.login_url, {"email": "alice@example.com", "password": "pass12345"}, format="json")
@@ -101,3 +142,1241 @@ class MoviesAPITest(APITestCase):
         self.assertEqual(list_resp.data["limit"], 10)
         self.assertTrue(isinstance(list_resp.data["total"], int))
         self.assertLessEqual(len(list_resp.data["items"]), 10)
+
+
+class RatingAggregatesTest(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.bob = User.objects.create_user(email="bob@example.com", password="pass12345")
+        self.movie = Movie.objects.create(title="Heat", genre="Crime", release_year=1995, created_by=self.alice)
+
+    def test_insert_update_delete_apply_deltas(self):
+        r1 = Rating.objects.create(user=self.alice, movie=self.movie, rating=5)
+        Rating.objects.create(user=self.bob, movie=self.movie, rating=2)
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.ratings_count, self.movie.ratings_sum), (2, 7))
+        self.assertEqual(str(self.movie.ratings_avg), "3.50")
+
+        r1 = Rating.objects.get(pk=r1.pk)
+        r1.rating = 3
+        r1.save()
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.ratings_count, self.movie.ratings_sum), (2, 5))
+        self.assertEqual(str(self.movie.ratings_avg), "2.50")
+
+        r1.delete()
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.ratings_count, self.movie.ratings_sum), (1, 2))
+        self.assertEqual(str(self.movie.ratings_avg), "2.00")
+
+    def test_deleting_a_user_takes_their_ratings_out_of_the_aggregates(self):
+        other = Movie.objects.create(title="Up", genre="Animation", release_year=2009, created_by=self.alice)
+        Rating.objects.create(user=self.alice, movie=self.movie, rating=4)
+        Rating.objects.create(user=self.bob, movie=self.movie, rating=1)
+        Rating.objects.create(user=self.bob, movie=other, rating=5)
+        self.bob.delete()
+
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.ratings_count, self.movie.ratings_sum, str(self.movie.ratings_avg)), (1, 4, "4.00"))
+        self.assertEqual(self.histogram(), [0, 0, 0, 1, 0])
+        self.assertEqual(MovieRanking.objects.get(movie=self.movie).votes, 1)
+        other.refresh_from_db()
+        self.assertEqual((other.ratings_count, other.ratings_sum, other.ratings_5), (0, 0, 0))
+
+    def test_queryset_and_deferred_deletes_apply_deltas(self):
+        Rating.objects.create(user=self.alice, movie=self.movie, rating=4)
+        Rating.objects.create(user=self.bob, movie=self.movie, rating=2)
+        Rating.objects.filter(user=self.bob).delete()
+        Rating.objects.only("id", "movie").get(user=self.alice).delete()
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.ratings_count, self.movie.ratings_sum), (0, 0))
+        self.assertEqual(self.histogram(), [0, 0, 0, 0, 0])
+
+    def test_rebuild_command_fixes_drift(self):
+        Rating.objects.create(user=self.alice, movie=self.movie, rating=4)
+        Movie.objects.filter(pk=self.movie.pk).update(ratings_count=9, ratings_sum=1)
+        out = StringIO()
+        call_command("rebuild_rating_aggregates", stdout=out)
+        self.assertIn(f"drift: movie {self.movie.pk}", out.getvalue())
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.ratings_count, self.movie.ratings_sum), (1, 4))
+        self.assertEqual(str(self.movie.ratings_avg), "4.00")
+
+    def histogram(self):
+        self.movie.refresh_from_db()
+        return [getattr(self.movie, field) for field in Movie.HISTOGRAM_FIELDS]
+
+    def test_star_histogram_follows_writes(self):
+        r1 = Rating.objects.create(user=self.alice, movie=self.movie, rating=5)
+        Rating.objects.create(user=self.bob, movie=self.movie, rating=2)
+        self.assertEqual(self.histogram(), [0, 1, 0, 0, 1])
+
+        r1 = Rating.objects.get(pk=r1.pk)
+        r1.rating = 3
+        r1.save()
+        self.assertEqual(self.histogram(), [0, 1, 1, 0, 0])
+
+        r1.delete()
+        self.assertEqual(self.histogram(), [0, 1, 0, 0, 0])
+
+        resp = self.client.get(f"/api/movies/{self.movie.pk}/")
+        self.assertEqual(resp.json()["ratings_histogram"], {"1": 0, "2": 1, "3": 0, "4": 0, "5": 0})
+
+    def test_rebuild_command_fixes_histogram_drift(self):
+        Rating.objects.create(user=self.alice, movie=self.movie, rating=4)
+        Rating.objects.create(user=self.bob, movie=self.movie, rating=4)
+        Movie.objects.filter(pk=self.movie.pk).update(ratings_4=0, ratings_1=3)
+        out = StringIO()
+        call_command("rebuild_rating_aggregates", stdout=out)
+        self.assertIn("ratings_4 0 -> 2", out.getvalue())
+        self.assertEqual(self.histogram(), [0, 0, 0, 2, 0])
+
+
+class CursorPaginationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        for i in range(25):
+            Movie.objects.create(title=f"M{i}", genre="Action", release_year=2000 + i, created_by=self.user)
+
+    def test_cursor_walks_all_movies_without_overlap(self):
+        seen = []
+        resp = self.client.get("/api/movies/?cursor=&limit=10")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["total"], 25)
+        self.assertEqual(resp.data["limit"], 10)
+        while True:
+            seen.extend(item["id"] for item in resp.data["items"])
+            if not resp.data["next_cursor"]:
+                break
+            resp = self.client.get(f"/api/movies/?cursor={resp.data['next_cursor']}&limit=10")
+            # total comes from the cache, not another COUNT(*)
+            self.assertEqual(resp.data["total"], 25)
+        expected = list(Movie.objects.order_by("-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_rating_cursor_seeks_on_created_at_and_id(self):
+        movie = Movie.objects.first()
+        for i in range(5):
+            other = User.objects.create_user(email=f"u{i}@example.com", password="pass12345")
+            Rating.objects.create(user=other, movie=movie, rating=3)
+        first = self.client.get(f"/api/movies/{movie.pk}/ratings/?cursor=&limit=3")
+        second = self.client.get(f"/api/movies/{movie.pk}/ratings/?cursor={first.data['next_cursor']}&limit=3")
+        ids = [r["id"] for r in first.data["items"] + second.data["items"]]
+        self.assertEqual(ids, list(Rating.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+        self.assertIsNone(second.data["next_cursor"])
+
+    def test_invalid_cursor_returns_404(self):
+        resp = self.client.get("/api/movies/?cursor=not-a-cursor")
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_wrongly_typed_values_returns_404(self):
+        def cursor(values):
+            return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+        movie = Movie.objects.first()
+        for values in (["x"], [{}], [None], [[1]]):
+            self.assertEqual(self.client.get(f"/api/movies/?cursor={cursor(values)}").status_code, 404, values)
+        for values in ([5, 5], ["yesterday", 5], [None, 5]):
+            resp = self.client.get(f"/api/movies/{movie.pk}/ratings/?cursor={cursor(values)}")
+            self.assertEqual(resp.status_code, 404, values)
+        resp = self.client.get(f"/api/movies/{movie.pk}/ratings/?cursor={cursor(['2024-01-01T00:00:00Z', '7'])}")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+
+class MovieSearchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.inception = Movie.objects.create(
+            title="Inception", genre="Sci-Fi", release_year=2010,
+            description="A thief enters dreams", created_by=self.user,
+        )
+        self.heat = Movie.objects.create(
+            title="Heat", genre="Crime", release_year=1995,
+            description="A heist movie with dream casting", created_by=self.user,
+        )
+
+    def search(self, query):
+        resp = self.client.get("/api/movies/", {"search": query})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return [item["title"] for item in resp.data["items"]]
+
+    def test_prefix_search_ranks_title_matches_first(self):
+        self.assertEqual(self.search("incep"), ["Inception"])
+        self.assertEqual(self.search("dream"), ["Inception", "Heat"])
+
+    def test_search_combines_with_filters(self):
+        resp = self.client.get("/api/movies/", {"search": "dream", "max_year": 2000})
+        self.assertEqual([item["title"] for item in resp.data["items"]], ["Heat"])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.heat.title = "Collateral"
+        self.heat.save()
+        self.assertEqual(self.search("collat"), ["Collateral"])
+        self.inception.delete()
+        self.assertEqual(self.search("incep"), [])
+
+    def test_fts_syntax_is_not_injected(self):
+        self.assertEqual(self.search('"incep*('), ["Inception"])
+
+    def test_cursor_mode_is_refused_for_ranked_search(self):
+        for url in ("/api/movies/", "/api/async/movies/"):
+            resp = self.client.get(url, {"search": "dream", "cursor": ""})
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("cursor", resp.json())
+        resp = self.client.get("/api/movies/", {"genre": "crime", "cursor": ""})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.movies = [
+            Movie.objects.create(
+                title=f"M{i}", genre="Action", release_year=2000 + i,
+                description="a long description", created_by=self.user,
+            )
+            for i in range(3)
+        ]
+        Rating.objects.create(user=self.user, movie=self.movies[0], rating=4, review="good")
+
+    def get_with_sql(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp, ctx.captured_queries[-1]["sql"]
+
+    def test_movie_list_fields_narrow_output_and_columns(self):
+        resp, sql = self.get_with_sql("/api/movies/?fields=id,title,genre,ratings_avg")
+        self.assertEqual([list(item) for item in resp.data["items"]], [["id", "title", "genre", "ratings_avg"]] * 3)
+        self.assertIn('"movies_movie"."title"', sql)
+        self.assertNotIn('"movies_movie"."description"', sql)
+        self.assertNotIn('"movies_movie"."ratings_5"', sql)
+
+    def test_exclude_and_computed_fields(self):
+        resp, sql = self.get_with_sql(f"/api/movies/{self.movies[0].pk}/?exclude=description")
+        self.assertNotIn("description", resp.data)
+        self.assertEqual(resp.data["ratings_histogram"], {"1": 0, "2": 0, "3": 0, "4": 1, "5": 0})
+        self.assertEqual(resp.data["created_by"], self.user.pk)
+        self.assertNotIn('"movies_movie"."description"', sql)
+
+    def test_rating_fields_skip_the_user_join(self):
+        url = f"/api/movies/{self.movies[0].pk}/ratings/"
+        resp, sql = self.get_with_sql(url + "?fields=rating&cursor=")
+        self.assertEqual(resp.data["items"], [{"rating": 4}])
+        self.assertNotIn("JOIN", sql)
+        resp, sql = self.get_with_sql(f"/api/users/{self.user.pk}/ratings/?fields=user,rating")
+        self.assertEqual(resp.data["items"], [{"user": self.user.username, "rating": 4}])
+        self.assertNotIn('"movies_rating"."review"', sql)
+
+    def test_cursor_still_pages_with_narrow_fields(self):
+        first = self.client.get("/api/movies/?fields=title&cursor=&limit=2")
+        second = self.client.get(f"/api/movies/?fields=title&cursor={first.data['next_cursor']}&limit=2")
+        titles = [item["title"] for item in first.data["items"] + second.data["items"]]
+        self.assertEqual(titles, ["M2", "M1", "M0"])
+
+    def test_unknown_field_is_rejected(self):
+        resp = self.client.get("/api/movies/?fields=id,budget")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("budget", resp.data["detail"])
+
+
+class FastListRenderingTest(APITestCase):
+    """The values_list()/orjson list path must match the DRF serializer path byte for byte."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="zoë@example.com", password="pass12345")
+        self.movies = [
+            Movie.objects.create(title="Amélie", genre="Comedy", release_year=2001, description=None, created_by=self.user),
+            Movie.objects.create(
+                title="Heat", genre="Crime", release_year=1995,
+                description='line\u2028sep "quoted" \\ tab\t', created_by=self.user,
+            ),
+            Movie.objects.create(title="Up", genre="Animation", release_year=2009, created_by=self.user),
+        ]
+        Rating.objects.create(user=self.user, movie=self.movies[1], rating=4, review="tense ✓")
+        Rating.objects.create(user=self.user, movie=self.movies[0], rating=3, review="")
+
+    def assertSameBody(self, url):
+        fast = self.client.get(url)
+        cache.clear()
+        with patch.object(RowListMixin, "list", ListModelMixin.list), \
+                patch.object(FastJSONRenderer, "render", JSONRenderer.render):
+            stock = self.client.get(url)
+        cache.clear()
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, stock.content)
+
+    def test_movie_list(self):
+        for query in ("", "?limit=2&page=2", "?cursor=&limit=2", "?search=heat", "?fields=title,ratings_histogram"):
+            with self.subTest(query=query):
+                self.assertSameBody("/api/movies/" + query)
+
+    def test_rating_lists(self):
+        self.assertSameBody(f"/api/movies/{self.movies[1].pk}/ratings/")
+        self.assertSameBody(f"/api/users/{self.user.pk}/ratings/?cursor=")
+        self.assertSameBody(f"/api/users/{self.user.pk}/ratings/?exclude=user")
+
+    def test_renderer_escapes_line_separators_like_drf(self):
+        data = {"text": "a\u2028b\u2029c", "when": timezone.now(), "n": Decimal("1.50")}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class MovieBatchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.movies = [
+            Movie.objects.create(title=f"M{i}", genre="Action", release_year=2000 + i, created_by=self.user)
+            for i in range(4)
+        ]
+
+    def test_keeps_requested_order_and_reports_missing(self):
+        ids = [self.movies[2].pk, 999999, self.movies[0].pk, self.movies[2].pk]
+        with self.assertNumQueries(1):
+            resp = self.client.get("/api/movies/batch/", {"ids": ",".join(map(str, ids))})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["title"] for item in resp.data["items"]], ["M2", "M0"])
+        self.assertEqual(resp.data["missing"], [999999])
+        detail = self.client.get(f"/api/movies/{self.movies[2].pk}/").json()
+        self.assertEqual(resp.json()["items"][0], detail)
+
+    def test_post_variant_and_sparse_fields(self):
+        ids = [movie.pk for movie in reversed(self.movies)]
+        resp = self.client.post("/api/movies/batch/?fields=id,title", {"ids": ids}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["items"], [{"id": movie.pk, "title": movie.title} for movie in reversed(self.movies)])
+        self.assertEqual(resp.data["missing"], [])
+
+    def test_rejects_bad_requests(self):
+        for query in ("", "?ids=", "?ids=1,abc", "?ids=" + ",".join(map(str, range(1, 502)))):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get("/api/movies/batch/" + query).status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self.client.post("/api/movies/batch/", {"ids": "1,2"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MovieFacetsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        for title, genre, year in [
+            ("Heat", "Crime", 1995), ("Casino", "crime", 1995), ("Se7en", "Crime", 1995),
+            ("Up", "Animation", 2009), ("Alien", "Sci-Fi", 1979), ("Aliens", "Sci-Fi", 1986),
+        ]:
+            Movie.objects.create(title=title, genre=genre, release_year=year, created_by=self.user)
+
+    def test_counts_genres_case_insensitively_and_buckets_decades(self):
+        with self.assertNumQueries(1):
+            resp = self.client.get("/api/movies/facets/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["total"], 6)
+        self.assertEqual(resp.data["genres"], [
+            {"genre": "Crime", "count": 3}, {"genre": "Sci-Fi", "count": 2}, {"genre": "Animation", "count": 1},
+        ])
+        self.assertEqual(resp.data["decades"], [
+            {"decade": 1970, "count": 1}, {"decade": 1980, "count": 1},
+            {"decade": 1990, "count": 3}, {"decade": 2000, "count": 1},
+        ])
+
+    def test_respects_list_filters_and_search(self):
+        resp = self.client.get("/api/movies/facets/", {"search": "alien", "min_year": 1980})
+        self.assertEqual(resp.data["genres"], [{"genre": "Sci-Fi", "count": 1}])
+        self.assertEqual(resp.data["decades"], [{"decade": 1980, "count": 1}])
+        resp = self.client.get("/api/movies/facets/", {"genre": "CRIME"})
+        self.assertEqual(resp.data["total"], 3)
+
+    def test_cached_for_everyone_until_the_catalog_changes(self):
+        self.client.get("/api/movies/facets/")
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        principal_cache.set(self.user.pk, self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/movies/facets/").data["total"], 6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.create(title="Tenet", genre="Sci-Fi", release_year=2020, created_by=self.user)
+        self.assertEqual(self.client.get("/api/movies/facets/").data["total"], 7)
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.get(title="Tenet").delete()
+        self.assertEqual(self.client.get("/api/movies/facets/").data["total"], 6)
+
+    def test_votes_keep_the_cache_but_edits_and_deletes_drop_it(self):
+        self.client.get("/api/movies/facets/")
+        heat = Movie.objects.get(title="Heat")
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(user=self.user, movie=heat, rating=5)
+        with self.assertNumQueries(0):
+            self.client.get("/api/movies/facets/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            heat.release_year = 2001
+            heat.save()
+        self.assertEqual(self.client.get("/api/movies/facets/").data["decades"][-1], {"decade": 2000, "count": 2})
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.filter(title="Casino").delete()
+        self.assertEqual(self.client.get("/api/movies/facets/").data["total"], 5)
+
+
+class GenreTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.heat = Movie.objects.create(title="Heat", genre="Crime", release_year=1995, created_by=self.user)
+        Movie.objects.create(title="Casino", genre=" crime ", release_year=1995, created_by=self.user)
+        Movie.objects.create(title="Up", genre="Animation", release_year=2009, created_by=self.user)
+
+    def test_names_share_one_row_case_insensitively(self):
+        self.assertEqual(Genre.objects.count(), 2)
+        self.assertEqual(Movie.objects.filter(genre=self.heat.genre).count(), 2)
+        self.assertEqual(self.heat.genre.name, "Crime")
+
+    def test_api_reads_and_writes_names(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        resp = self.client.post(
+            "/api/movies/", {"title": "Ronin", "genre": "CRIME", "release_year": 1998}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["genre"], "Crime")
+        self.assertEqual(Genre.objects.count(), 2)
+        self.assertEqual(self.client.get(f"/api/movies/{self.heat.pk}/").data["genre"], "Crime")
+
+    def test_genre_filter_is_an_integer_match(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/movies/", {"genre": "CRIME"})
+        self.assertEqual([item["title"] for item in resp.data["items"]], ["Casino", "Heat"])
+        self.assertTrue(all(item["genre"] == "Crime" for item in resp.data["items"]))
+        sql = next(q["sql"] for q in ctx.captured_queries if "LIMIT" in q["sql"])
+        self.assertIn('"movies_movie"."genre_id" = (SELECT', sql)
+        self.assertNotIn("LOWER", sql)
+
+    def titles(self, **params):
+        return sorted(item["title"] for item in self.client.get("/api/movies/", params).data["items"])
+
+    def test_rename_reaches_search_and_cached_pages(self):
+        self.assertEqual(self.titles(search="crime"), ["Casino", "Heat"])
+        with self.captureOnCommitCallbacks(execute=True):
+            genre = self.heat.genre
+            genre.name = "Heist"
+            genre.save()
+        self.assertEqual(self.titles(search="crime"), [])
+        self.assertEqual(self.titles(search="heist"), ["Casino", "Heat"])
+        self.assertEqual(self.titles(genre="heist"), ["Casino", "Heat"])
+        self.assertEqual(self.client.get(f"/api/movies/{self.heat.pk}/").data["genre"], "Heist")
+
+
+class MyRatingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        other = User.objects.create_user(email="bob@example.com", password="pass12345")
+        self.heat = Movie.objects.create(title="Heat", genre="Crime", release_year=1995, created_by=self.user)
+        self.up = Movie.objects.create(title="Up", genre="Animation", release_year=2009, created_by=self.user)
+        Rating.objects.create(user=self.user, movie=self.heat, rating=4)
+        Rating.objects.create(user=other, movie=self.heat, rating=1)
+        Rating.objects.create(user=other, movie=self.up, rating=5)
+
+    def login(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        principal_cache.set(self.user.pk, self.user)
+
+    def test_anonymous_responses_are_unchanged(self):
+        item = self.client.get("/api/movies/").data["items"][0]
+        self.assertNotIn("my_rating", item)
+        self.assertNotIn("my_rating", self.client.get(f"/api/movies/{self.heat.pk}/").data)
+        self.assertEqual(self.client.get("/api/movies/", {"fields": "my_rating"}).status_code, 400)
+
+    def test_list_and_detail_carry_my_rating_in_the_same_query(self):
+        self.login()
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/movies/")
+        page_sql = [q["sql"] for q in ctx.captured_queries if 'FROM "movies_movie"' in q["sql"] and "LIMIT" in q["sql"]]
+        self.assertEqual(len(page_sql), 1)
+        self.assertIn('"movies_rating"', page_sql[0])
+        self.assertEqual({item["title"]: item["my_rating"] for item in resp.data["items"]}, {"Heat": 4, "Up": None})
+
+        with self.assertNumQueries(1):
+            resp = self.client.get(f"/api/movies/{self.heat.pk}/")
+        self.assertEqual(resp.data["my_rating"], 4)
+
+    def test_sparse_fieldsets(self):
+        self.login()
+        resp = self.client.get("/api/movies/", {"fields": "id,my_rating"})
+        self.assertEqual(resp.data["items"], [{"id": self.up.pk, "my_rating": None}, {"id": self.heat.pk, "my_rating": 4}])
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(f"/api/movies/{self.heat.pk}/", {"fields": "id,title"})
+        self.assertNotIn('"movies_rating"', ctx.captured_queries[-1]["sql"])
+
+
+class QueryBudgetTest(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(email=f"u{i}@example.com", password="pass12345") for i in range(3)]
+        cls.movies = [
+            Movie.objects.create(title=f"M{i}", genre="Action", release_year=2000 + i, created_by=cls.users[i % 3])
+            for i in range(60)
+        ]
+        for movie in cls.movies[:2]:
+            for user in cls.users:
+                Rating.objects.create(user=user, movie=movie, rating=4)
+
+    def test_movie_list(self):
+        # COUNT + page
+        self.assertQueryBudget("/api/movies/", 2)
+        self.assertQueryBudget("/api/movies/?genre=action&min_year=2001", 2)
+
+    def test_movie_detail(self):
+        self.assertQueryBudget(f"/api/movies/{self.movies[0].pk}/", 1)
+
+    def test_rating_lists(self):
+        self.assertQueryBudget(f"/api/movies/{self.movies[0].pk}/ratings/", 2, page_sizes=(1, 3))
+        self.assertQueryBudget(f"/api/users/{self.users[0].pk}/ratings/", 2, page_sizes=(1, 2))
+
+
+class ResponseCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.movie = Movie.objects.create(title="Heat", genre="Crime", release_year=1995, created_by=self.user)
+
+    def test_list_served_from_cache_and_revalidated_with_etag(self):
+        first = self.client.get("/api/movies/?limit=5&page=1")
+        etag = first["ETag"]
+        with self.assertNumQueries(0):
+            again = self.client.get("/api/movies/?page=1&limit=5")
+            self.assertEqual(again.data, first.data)
+            self.assertEqual(again["ETag"], etag)
+            not_modified = self.client.get("/api/movies/?page=1&limit=5", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_bump_versions(self):
+        list_etag = self.client.get("/api/movies/")["ETag"]
+        detail_etag = self.client.get(f"/api/movies/{self.movie.pk}/")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(user=self.user, movie=self.movie, rating=5)
+        resp = self.client.get(f"/api/movies/{self.movie.pk}/", HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["ratings_count"], 1)
+        self.assertNotEqual(self.client.get("/api/movies/")["ETag"], list_etag)
+
+        list_etag = self.client.get("/api/movies/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.create(title="Ronin", genre="Crime", release_year=1998, created_by=self.user)
+        resp = self.client.get("/api/movies/", HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(resp.data["total"], 2)
+
+
+class BulkRatingsTest(APITestCase):
+    url = "/api/ratings/bulk/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.client.force_authenticate(self.user)
+        self.movies = [
+            Movie.objects.create(title=f"M{i}", genre="Drama", release_year=2000, created_by=self.user)
+            for i in range(3)
+        ]
+
+    def test_json_array_upserts_and_reports_per_row(self):
+        Rating.objects.create(user=self.user, movie=self.movies[0], rating=1)
+        rows = [
+            {"movie": self.movies[0].pk, "rating": 5, "review": "changed my mind"},
+            {"movie": self.movies[1].pk, "rating": 4},
+            {"movie": self.movies[2].pk, "rating": 9},
+            {"movie": 999999, "rating": 3},
+        ]
+        resp = self.client.post(self.url, rows, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["status"] for r in resp.data["results"]], ["updated", "created", "error", "error"])
+        self.assertEqual((resp.data["created"], resp.data["updated"], resp.data["errors"]), (1, 1, 2))
+
+        self.movies[0].refresh_from_db()
+        self.movies[1].refresh_from_db()
+        self.assertEqual((self.movies[0].ratings_count, str(self.movies[0].ratings_avg)), (1, "5.00"))
+        self.assertEqual((self.movies[1].ratings_count, str(self.movies[1].ratings_avg)), (1, "4.00"))
+        self.assertEqual((self.movies[0].ratings_1, self.movies[0].ratings_5), (0, 1))
+
+    def test_ndjson_stream_touches_each_movie_once(self):
+        body = "\n".join(
+            json.dumps({"movie": movie.pk, "rating": stars}) for movie, stars in zip(self.movies, (2, 3, 4))
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(self.url, body, content_type="application/x-ndjson")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["created"], 3)
+        movie_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "movies_movie"')]
+        # one F() update per movie plus a single bulk avg update
+        self.assertEqual(len(movie_updates), len(self.movies) + 1)
+        self.assertEqual(
+            list(Movie.objects.order_by("id").values_list("ratings_sum", flat=True)), [2, 3, 4]
+        )
+
+    def test_rejects_non_array_body(self):
+        resp = self.client.post(self.url, {"movie": 1, "rating": 5}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(MOVIES_DEFER_AGGREGATES=True, MOVIES_AGGREGATE_DELAY=0)
+class DeferredAggregatesTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user(email=f"u{i}@example.com", password="pass12345") for i in range(5)]
+        self.movie = Movie.objects.create(title="Heat", genre="Crime", release_year=1995, created_by=self.users[0])
+
+    def rate(self, user, stars):
+        self.client.force_authenticate(user)
+        return self.client.post(f"/api/movies/{self.movie.pk}/ratings/", {"rating": stars}, format="json")
+
+    def test_votes_coalesce_into_one_recompute(self):
+        for user, stars in zip(self.users, [5, 4, 4, 3, 1]):
+            self.assertEqual(self.rate(user, stars).status_code, status.HTTP_201_CREATED)
+        self.rate(self.users[4], 2)
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.ratings_count, 0)
+        self.assertEqual(Task.objects.filter(name=Movie.AGGREGATE_TASK, key=str(self.movie.pk)).count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(run_due(), (1, 0))
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.ratings_count, self.movie.ratings_sum, str(self.movie.ratings_avg)), (5, 18, "3.60"))
+        self.assertEqual((self.movie.ratings_2, self.movie.ratings_4), (1, 2))
+        self.assertEqual(MovieRanking.objects.get(movie=self.movie).votes, 5)
+        self.assertFalse(Task.objects.exists())
+
+    def test_response_shows_stored_aggregates_flagged_pending(self):
+        self.rate(self.users[0], 5)
+        run_due()
+        for stars in (2, 4):  # a queued vote, then a change to it
+            resp = self.rate(self.users[1], stars)
+            self.assertTrue(resp.data["aggregates_pending"])
+            movie = resp.data["movie"]
+            self.assertEqual((movie["ratings_count"], str(movie["ratings_avg"])), (1, "5.00"))
+        run_due()
+        self.assertEqual(Movie.objects.get(pk=self.movie.pk).ratings_sum, 9)
+
+    @override_settings(MOVIES_DEFER_AGGREGATES=False)
+    def test_synchronous_response_is_not_pending(self):
+        resp = self.rate(self.users[1], 4)
+        self.assertFalse(resp.data["aggregates_pending"])
+        self.assertEqual(resp.data["movie"]["ratings_count"], 1)
+
+    def test_bulk_ratings_and_worker_command(self):
+        other = Movie.objects.create(title="Up", genre="Animation", release_year=2009, created_by=self.users[0])
+        self.client.force_authenticate(self.users[1])
+        rows = [{"movie": self.movie.pk, "rating": 4}, {"movie": other.pk, "rating": 2}]
+        self.client.post("/api/ratings/bulk/", rows, format="json")
+        self.assertEqual(Task.objects.count(), 2)
+
+        out = StringIO()
+        call_command("run_tasks", "--once", stdout=out)
+        self.assertIn("2 task(s) run, 0 failed", out.getvalue())
+        self.assertEqual(Movie.objects.get(pk=other.pk).ratings_count, 1)
+
+    def test_failed_tasks_are_retried_later(self):
+        self.rate(self.users[1], 4)
+        with patch.object(Movie, "recalc_ratings", side_effect=RuntimeError("locked")), \
+                self.assertLogs("movies.tasks", "WARNING"):
+            self.assertEqual(run_due(), (1, 1))
+        task = Task.objects.get()  # the claim was rolled back with the handler
+        self.assertEqual((task.attempts, task.last_error), (1, "RuntimeError('locked')"))
+        self.assertEqual(run_due(), (0, 0))  # backing off
+        self.assertEqual(run_due(now=task.run_after), (1, 0))
+        self.assertEqual(Movie.objects.get(pk=self.movie.pk).ratings_count, 1)
+
+    def test_worker_dying_mid_task_keeps_the_claim(self):
+        self.rate(self.users[1], 4)
+        pending = Task.objects.get()
+        with patch.object(Movie, "recalc_ratings", side_effect=KeyboardInterrupt), self.assertRaises(KeyboardInterrupt):
+            run_due()
+        self.assertEqual(Task.objects.get().pk, pending.pk)
+        self.assertEqual(run_due(), (1, 0))
+        self.assertEqual(Movie.objects.get(pk=self.movie.pk).ratings_count, 1)
+
+    @override_settings(MOVIES_DEFER_AGGREGATES=False)
+    def test_synchronous_by_setting(self):
+        self.rate(self.users[1], 4)
+        self.assertEqual(Movie.objects.get(pk=self.movie.pk).ratings_count, 1)
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(MOVIES_RATING_SHARDS=4, MOVIES_AGGREGATE_DELAY=0)
+class RatingShardsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user(email=f"u{i}@example.com", password="pass12345") for i in range(12)]
+        self.movie = Movie.objects.create(title="Heat", genre="Crime", release_year=1995, created_by=self.users[0])
+
+    def rate(self, user, stars):
+        self.client.force_authenticate(user)
+        return self.client.post(f"/api/movies/{self.movie.pk}/ratings/", {"rating": stars}, format="json")
+
+    def test_votes_go_to_shards_not_the_movie_row(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.rate(self.users[0], 5)
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "movies_movie"')])
+        for i, user in enumerate(self.users[1:]):
+            self.rate(user, i % 5 + 1)
+        self.assertEqual(Movie.objects.get(pk=self.movie.pk).ratings_count, 0)
+        self.assertLessEqual(MovieRatingShard.objects.filter(movie=self.movie).count(), 4)
+        self.assertEqual(Task.objects.filter(name=Movie.FOLD_TASK).count(), 1)
+
+    def test_fold_matches_a_recount(self):
+        for i, user in enumerate(self.users):
+            self.rate(user, i % 5 + 1)
+        self.rate(self.users[0], 2)  # 1 -> 2
+        Rating.objects.get(user=self.users[1]).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(run_due(), (1, 0))
+        folded = Movie.objects.get(pk=self.movie.pk)
+        fields = Movie.AGGREGATE_FIELDS
+        self.assertEqual(folded.ratings_count, 11)
+        self.assertTrue(all(not any(shard.stars()) for shard in MovieRatingShard.objects.all()))
+
+        folded.recalc_ratings()
+        recounted = Movie.objects.get(pk=self.movie.pk)
+        self.assertEqual([getattr(folded, f) for f in fields], [getattr(recounted, f) for f in fields])
+        self.assertEqual(MovieRanking.objects.get(movie=self.movie).votes, 11)
+
+    def test_recount_discards_unfolded_shards(self):
+        self.rate(self.users[0], 4)
+        self.movie.recalc_ratings()
+        self.assertFalse(MovieRatingShard.objects.exists())
+        run_due()
+        self.assertEqual(Movie.objects.get(pk=self.movie.pk).ratings_count, 1)
+
+
+@override_settings(MOVIES_RATING_SHARDS=4, MOVIES_AGGREGATE_DELAY=0)
+class RatingShardsConcurrencyTest(TransactionTestCase):
+    writers = 8
+    votes = 25
+
+    def test_many_writers_touch_the_task_queue_only_per_emptied_shard(self):
+        users = [User.objects.create_user(email=f"w{i}@example.com", password="pass12345") for i in range(self.writers)]
+        movie = Movie.objects.create(title="Premiere", genre="Drama", release_year=2025, created_by=users[0])
+        # the in-memory test database can't hold two write transactions at
+        # once, so they take turns here; benchmarks/contention.py measures
+        # throughput on a real database file or server
+        db_lock = threading.Lock()
+        task_writes, folds, errors = [], [], []
+        cast = itertools.count(1)
+        fold_now, done = threading.Event(), threading.Event()
+
+        def count_task_writes(execute, sql, params, many, context):
+            if sql.startswith("INSERT") and '"movies_task"' in sql:
+                task_writes.append(sql)
+            return execute(sql, params, many, context)
+
+        def writer(offset, user):
+            try:
+                with connection.execute_wrapper(count_task_writes):
+                    for vote in range(self.votes):
+                        with db_lock:
+                            upsert_rating(user, movie, (offset + vote) % 5 + 1, "")
+                        if next(cast) % 25 == 0:
+                            fold_now.set()  # the worker folds while the writers carry on
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        def worker():
+            try:
+                while not done.is_set():
+                    if fold_now.wait(0.01):
+                        fold_now.clear()
+                        with db_lock:
+                            folds.append(run_due(limit=10)[0])
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        folder = threading.Thread(target=worker)
+        threads = [threading.Thread(target=writer, args=(i, user)) for i, user in enumerate(users)]
+        folder.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        folder.join()
+        while run_due()[0]:
+            pass
+
+        self.assertEqual(errors, [])
+        # each fold empties at most every shard, and only an emptied shard's next vote queues one
+        self.assertLessEqual(len(task_writes), 4 * (sum(folds) + 1))
+        self.assertLess(len(task_writes), self.writers * self.votes / 4)
+        movie.refresh_from_db()
+        folded = [getattr(movie, field) for field in Movie.AGGREGATE_FIELDS]
+        movie.recalc_ratings()
+        self.assertEqual(folded, [getattr(movie, field) for field in Movie.AGGREGATE_FIELDS])
+        self.assertEqual(movie.ratings_count, self.writers)
+
+
+class GenerateDatasetTest(TestCase):
+    def test_generates_requested_rows_with_consistent_aggregates(self):
+        call_command("generate_dataset", seed=7, users=20, movies=15, ratings=120, chunk_size=50, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Movie.objects.count(), 15)
+        self.assertEqual(Rating.objects.count(), 120)
+        self.assertTrue(User.objects.get(email="user1@example.com").check_password("password123"))
+
+        out = StringIO()
+        call_command("rebuild_rating_aggregates", dry_run=True, stdout=out)
+        self.assertIn("0 movie(s)", out.getvalue())
+
+    def test_same_seed_same_ratings(self):
+        def snapshot():
+            return list(Rating.objects.order_by("user__email", "movie__title").values_list("user__email", "movie__title", "rating"))
+
+        call_command("generate_dataset", seed=3, users=10, movies=10, ratings=40, stdout=StringIO())
+        first = snapshot()
+        Rating.objects.all().delete()
+        Movie.objects.all().delete()
+        call_command("generate_dataset", seed=3, users=10, movies=10, ratings=40, stdout=StringIO())
+        self.assertEqual(snapshot(), first)
+
+
+class BenchmarkSuiteTest(TestCase):
+    def test_every_route_has_a_scenario(self):
+        from benchmarks.suite import uncovered_routes
+        self.assertEqual(uncovered_routes(), [])
+
+    def test_suite_runs_on_a_tiny_dataset(self):
+        from benchmarks.suite import run_suite
+        call_command("generate_dataset", seed=1, users=5, movies=5, ratings=10, stdout=StringIO())
+        results = run_suite(iterations=1, only={"movie-list", "movie-rate"})
+        self.assertEqual(set(results), {"movie-list", "movie-rate"})
+        self.assertEqual(results["movie-list"]["status"], [200])
+        self.assertEqual(results["movie-list"]["queries"], 2)
+
+    def test_update_baseline_only_rewrites_scenarios_that_moved(self):
+        from benchmarks.suite import update_baseline
+        row = lambda queries, p95: {"queries": queries, "p95_ms": p95}
+        baseline = {"scale": "1k", "scenarios": {
+            "steady": row(2, 10.0), "more-queries": row(2, 10.0), "slower": row(1, 10.0), "untouched": row(1, 5.0),
+        }}
+        results = {"scale": "1k", "scenarios": {
+            "steady": row(2, 11.0), "more-queries": row(3, 10.0), "slower": row(1, 14.0), "new": row(1, 1.0),
+        }}
+        updated, changed = update_baseline(results, baseline, tolerance=0.25)
+        self.assertEqual(changed, ["more-queries", "slower", "new"])
+        self.assertEqual(updated["scenarios"]["steady"], row(2, 10.0))
+        self.assertEqual(updated["scenarios"]["untouched"], row(1, 5.0))
+        self.assertEqual(updated["scenarios"]["slower"], row(1, 14.0))
+
+        replaced, changed = update_baseline({**results, "scale": "100k"}, baseline)
+        self.assertEqual(replaced["scale"], "100k")
+        self.assertNotIn("untouched", replaced["scenarios"])
+
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.heat = Movie.objects.create(title="Heat", genre="Crime", release_year=1995, created_by=self.user)
+        self.up = Movie.objects.create(title="Up", genre="Animation", release_year=2009, created_by=self.user)
+        Rating.objects.create(user=self.user, movie=self.heat, rating=4, review="tense")
+        Rating.objects.create(user=self.user, movie=self.up, rating=5)
+
+    def read(self, resp):
+        self.assertTrue(resp.streaming)
+        return b"".join(resp.streaming_content).decode()
+
+    def test_movie_ndjson_rows_match_api_representation(self):
+        resp = self.client.get("/api/movies/export/")
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self.read(resp).splitlines()]
+        api_items = self.client.get("/api/movies/").json()["items"]
+        self.assertEqual(rows, sorted(api_items, key=lambda item: item["id"]))
+
+    def test_rating_csv_respects_movie_filters(self):
+        resp = self.client.get("/api/ratings/export/", {"output": "csv", "genre": "crime"})
+        lines = self.read(resp).splitlines()
+        self.assertEqual(lines[0], "id,user,movie,rating,review,created_at,updated_at")
+        self.assertEqual(len(lines), 2)
+        self.assertIn(f",{self.user.username},{self.heat.pk},4,tense,", lines[1])
+
+    def test_unknown_output_is_rejected(self):
+        resp = self.client.get("/api/movies/export/", {"output": "xml"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncViewsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.movies = [
+            Movie.objects.create(title=f"M{i}", genre="Drama", release_year=2000 + i, created_by=self.user)
+            for i in range(12)
+        ]
+        Rating.objects.create(user=self.user, movie=self.movies[0], rating=3, review="ok")
+
+    async def test_read_contract_matches_sync_views(self):
+        movie_id = self.movies[0].pk
+        paths = [
+            "/movies/?limit=5&page=2",
+            "/movies/?genre=drama&min_year=2005&search=M",
+            "/movies/?cursor=&limit=5",
+            f"/movies/{movie_id}/",
+            f"/movies/{movie_id}/ratings/",
+            f"/users/{self.user.pk}/ratings/?cursor=",
+            "/movies/?page=99",
+            "/movies/999999/",
+        ]
+        for path in paths:
+            expected = await sync_to_async(self.client.get)(f"/api{path}")
+            actual = await self.async_client.get(f"/api/async{path}")
+            self.assertEqual(actual.status_code, expected.status_code, path)
+            self.assertEqual(actual.content, expected.content, path)
+
+    async def test_concurrent_requests_match_wsgi(self):
+        expected = await sync_to_async(self.client.get)("/api/movies/?limit=5")
+        responses = await asyncio.gather(
+            *[self.async_client.get("/api/async/movies/?limit=5") for _ in range(25)]
+        )
+        self.assertEqual({r.status_code for r in responses}, {200})
+        self.assertEqual({r.content for r in responses}, {expected.content})
+
+    async def test_rating_post(self):
+        url = f"/api/async/movies/{self.movies[1].pk}/ratings/"
+        resp = await self.async_client.post(url, {"rating": 5}, content_type="application/json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        auth = {"AUTHORIZATION": f"Bearer {self.token}"}
+        resp = await self.async_client.post(url, {"rating": 5, "review": "great"}, content_type="application/json", headers=auth)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.json()["movie"]["ratings_avg"], "5.00")
+
+        resp = await self.async_client.post(url, {"rating": 2}, content_type="application/json", headers=auth)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json()["movie"]["ratings_count"], 1)
+        self.assertEqual(resp.json()["movie"]["ratings_avg"], "2.00")
+
+        resp = await self.async_client.post(url, {"rating": 7}, content_type="application/json", headers=auth)
+        self.assertEqual(resp.json(), {"detail": "rating must be between 1 and 5"})
+
+
+class PrincipalCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        principal_cache.clear()
+        principal_cache.reset_stats()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        self.movie = Movie.objects.create(title="Heat", genre="Crime", release_year=1995, created_by=self.user)
+        self.url = f"/api/movies/{self.movie.pk}/ratings/"
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    def user_selects(self, ctx):
+        table = User._meta.db_table
+        return [q for q in ctx.captured_queries if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"]]
+
+    def test_second_request_resolves_user_without_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(self.url, {"rating": 4}, format="json", **self.auth)
+        self.assertEqual(len(self.user_selects(ctx)), 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(self.url, {"rating": 5}, format="json", **self.auth)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user_selects(ctx), [])
+        self.assertEqual(principal_cache.stats()["hits"], 1)
+        self.assertEqual(principal_cache.stats()["hit_rate"], 0.5)
+
+    def test_save_invalidates_and_deactivation_is_seen(self):
+        self.client.post(self.url, {"rating": 4}, format="json", **self.auth)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(principal_cache.stats()["invalidations"], 1)
+
+        resp = self.client.post(self.url, {"rating": 5}, format="json", **self.auth)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_delete_invalidates(self):
+        self.client.post(self.url, {"rating": 4}, format="json", **self.auth)
+        self.user.delete()
+        resp = self.client.post(self.url, {"rating": 5}, format="json", **self.auth)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(MOVIES_PRINCIPAL_CACHE_SIZE=1, MOVIES_PRINCIPAL_CACHE_TTL=0)
+    def test_lru_and_ttl_bounds(self):
+        principal_cache.set(1, self.user)
+        principal_cache.set(2, self.user)
+        self.assertEqual(principal_cache.stats()["evictions"], 1)
+        self.assertIsNone(principal_cache.get(2))  # already expired
+
+
+class TokenRefreshTest(APITestCase):
+    url = "/api/auth/refresh/"
+
+    def setUp(self):
+        principal_cache.clear()
+        token_blacklist.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        login = self.client.post("/api/auth/login/", {"email": "alice@example.com", "password": "pass12345"}, format="json")
+        self.refresh_token = login.data["refresh_token"]
+
+    def test_refresh_rotates_and_rejects_reuse(self):
+        resp = self.client.post(self.url, {"refresh_token": self.refresh_token}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["token_type"], "bearer")
+        self.assertNotEqual(resp.data["refresh_token"], self.refresh_token)
+
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {resp.data['access_token']}"}
+        movie = self.client.post("/api/movies/", {"title": "Heat", "genre": "Crime", "release_year": 1995}, format="json", **auth)
+        self.assertEqual(movie.status_code, status.HTTP_201_CREATED)
+
+        replay = self.client.post(self.url, {"refresh_token": self.refresh_token}, format="json")
+        self.assertEqual(replay.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_rotation_in_another_process_is_caught_by_the_table(self):
+        token_blacklist.clear()
+        BlacklistedToken.objects.create(
+            jti=RefreshToken(self.refresh_token)["jti"], expires_at=timezone.now() + timedelta(days=1)
+        )
+        token_blacklist._loaded_at = time.monotonic()  # local set is current but empty
+        resp = self.client.post(self.url, {"refresh_token": self.refresh_token}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_reload_only_reads_and_the_command_prunes_expired_rows(self):
+        now = timezone.now()
+        BlacklistedToken.objects.create(jti="expired", expires_at=now - timedelta(minutes=1))
+        BlacklistedToken.objects.create(jti="live", expires_at=now + timedelta(days=1))
+        token_blacklist.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertIn("live", token_blacklist)
+            self.assertNotIn("expired", token_blacklist)  # not loaded, but still stored
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith("DELETE")])
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+        out = StringIO()
+        call_command("prune_blacklisted_tokens", stdout=out)
+        self.assertIn("1 expired token(s) pruned", out.getvalue())
+        self.assertEqual(list(BlacklistedToken.objects.values_list("jti", flat=True)), ["live"])
+
+    def test_refresh_does_not_hash_passwords(self):
+        with patch("django.contrib.auth.hashers.PBKDF2PasswordHasher.encode") as encode:
+            resp = self.client.post(self.url, {"refresh_token": self.refresh_token}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        encode.assert_not_called()
+
+    def test_invalid_token_and_inactive_user(self):
+        resp = self.client.post(self.url, {"refresh_token": "garbage"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = False
+        self.user.save()
+        resp = self.client.post(self.url, {"refresh_token": self.refresh_token}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LeaderboardTest(APITestCase):
+    url = "/api/movies/top/"
+
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user(email=f"u{i}@example.com", password="pass12345") for i in range(12)]
+        make = lambda title, genre, year: Movie.objects.create(
+            title=title, genre=genre, release_year=year, created_by=self.users[0]
+        )
+        self.one_vote = make("One Vote Wonder", "Drama", 2001)
+        self.classic = make("Classic", "Drama", 1994)
+        self.solid = make("Solid", "Action", 1996)
+        self.unrated = make("Unrated", "Drama", 1999)
+        Rating.objects.create(user=self.users[0], movie=self.one_vote, rating=5)
+        for i, user in enumerate(self.users):
+            Rating.objects.create(user=user, movie=self.classic, rating=5 if i % 4 else 4)
+            Rating.objects.create(user=user, movie=self.solid, rating=4 if i % 3 else 3)
+
+    def titles(self, **params):
+        resp = self.client.get(self.url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return [item["title"] for item in resp.data["items"]]
+
+    def test_weighted_score_outranks_single_vote(self):
+        self.assertEqual(self.titles(), ["Classic", "Solid", "One Vote Wonder"])
+        self.assertEqual(self.titles(genre="DRAMA"), ["Classic", "One Vote Wonder"])
+        self.assertEqual(self.titles(decade="1990s", limit=1), ["Classic"])
+
+    def test_rating_writes_update_ranking_incrementally(self):
+        for user in self.users[1:]:
+            self.client.force_authenticate(user)
+            self.client.post(f"/api/movies/{self.one_vote.pk}/ratings/", {"rating": 5}, format="json")
+        self.client.force_authenticate(None)
+        self.assertEqual(self.titles()[0], "One Vote Wonder")
+
+        Rating.objects.filter(movie=self.one_vote).get(user=self.users[0]).delete()
+        self.assertEqual(MovieRanking.objects.get(movie=self.one_vote).votes, 11)
+        for rating in Rating.objects.filter(movie=self.one_vote):
+            rating.delete()
+        self.assertFalse(MovieRanking.objects.filter(movie=self.one_vote).exists())
+
+    def test_single_query_and_incremental_matches_full_sync(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {"genre": "drama", "decade": 1990})
+        incremental = {r.movie_id: r.score for r in MovieRanking.objects.all()}
+        MovieRanking.objects.all().delete()
+        MovieRanking.sync(Movie.objects.all())
+        self.assertEqual({r.movie_id: r.score for r in MovieRanking.objects.all()}, incremental)
+
+    def test_rebuild_refreshes_prior(self):
+        call_command("rebuild_leaderboard", stdout=StringIO())
+        self.assertAlmostEqual(RankingPrior.get_mean(), (5 + 57 + 44) / 25)
+        # shrinking towards a 4.24 mean lifts the lone 5 above Solid's 3.67 average
+        self.assertEqual(self.titles(), ["Classic", "One Vote Wonder", "Solid"])
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(self.url, {"decade": "nineties"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"limit": 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecommendationsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user(email=f"u{i}@example.com", password="pass12345") for i in range(8)]
+        self.movies = {
+            title: Movie.objects.create(title=title, genre="Drama", release_year=2000, created_by=self.users[0])
+            for title in ("Alien", "Aliens", "Notebook", "Titanic")
+        }
+        # users 0-3 love sci-fi and dislike romance, users 4-6 the reverse
+        for user in self.users[:4]:
+            self.rate(user, Alien=5, Aliens=5, Notebook=1, Titanic=2)
+        for user in self.users[4:7]:
+            self.rate(user, Alien=1, Aliens=2, Notebook=5, Titanic=5)
+        self.target = self.users[7]
+        self.rate(self.target, Alien=5, Notebook=1)
+
+    def rate(self, user, **ratings):
+        for title, value in ratings.items():
+            Rating.objects.create(user=user, movie=self.movies[title], rating=value)
+
+    def test_build_and_recommend(self):
+        out = StringIO()
+        call_command("build_recommendations", k=2, shrinkage=0, stdout=out)
+        self.assertIn("for 4 movie(s)", out.getvalue())
+        self.assertEqual(
+            [n.neighbor.title for n in MovieNeighbor.objects.filter(movie=self.movies["Alien"]).order_by("-similarity")],
+            ["Aliens"],
+        )
+
+        resp = self.client.get(f"/api/users/{self.target.pk}/recommendations/", {"limit": 2})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        items = resp.data["items"]
+        self.assertEqual(items[0]["title"], "Aliens")
+        self.assertGreater(items[0]["score"], 0)
+        # nothing else scores positively; the slot is filled from the leaderboard
+        self.assertEqual((items[1]["title"], items[1]["score"]), ("Titanic", None))
+
+    def test_similarities_match_dense_adjusted_cosine(self):
+        import numpy as np
+        from .recommender import build_neighbors, load_ratings
+
+        ratings = load_ratings()
+        neighbors = build_neighbors(ratings, k=3, shrinkage=0, block_size=1)
+        users, movies, stars = ratings
+        user_ids, movie_ids = np.unique(users), np.unique(movies)
+        dense = np.zeros((len(user_ids), len(movie_ids)))
+        dense[np.searchsorted(user_ids, users), np.searchsorted(movie_ids, movies)] = stars
+        rated = dense > 0
+        centred = np.where(rated, dense - dense.sum(1, keepdims=True) / rated.sum(1, keepdims=True), 0)
+        unit = centred / np.linalg.norm(centred, axis=0)
+        expected = unit.T @ unit
+        for movie_id, pairs in neighbors.items():
+            i = np.searchsorted(movie_ids, movie_id)
+            for neighbor_id, similarity in pairs:
+                self.assertAlmostEqual(similarity, expected[i, np.searchsorted(movie_ids, neighbor_id)], places=5)
+
+    def test_incremental_only_recomputes_rerated_movies(self):
+        call_command("build_recommendations", k=2, stdout=StringIO())
+        Rating.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+        MovieNeighbor.objects.update(computed_at=timezone.now() - timedelta(hours=1))
+        Rating.objects.filter(user=self.target, movie=self.movies["Notebook"]).update(rating=2, updated_at=timezone.now())
+        out = StringIO()
+        call_command("build_recommendations", k=2, incremental=True, stdout=out)
+        self.assertIn("for 1 movie(s)", out.getvalue())
+        self.assertEqual(
+            MovieNeighbor.objects.filter(computed_at__gt=timezone.now() - timedelta(minutes=1)).values_list("movie", flat=True).distinct().get(),
+            self.movies["Notebook"].pk,
+        )
+
+    def test_no_ratings_falls_back_to_leaderboard(self):
+        newcomer = User.objects.create_user(email="new@example.com", password="pass12345")
+        resp = self.client.get(f"/api/users/{newcomer.pk}/recommendations/", {"limit": 3})
+        self.assertEqual(len(resp.data["items"]), 3)
+        self.assertEqual({item["score"] for item in resp.data["items"]}, {None})
+
+
+class SimilarMoviesTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="alice@example.com", password="pass12345")
+        make = lambda title, genre, year, description: Movie.objects.create(
+            title=title, genre=genre, release_year=year, description=description, created_by=self.user
+        )
+        self.heat = make("Heat", "Crime", 1995, "A detective hunts a crew of bank robbers in Los Angeles.")
+        self.town = make("The Town", "Crime", 2010, "Bank robbers in Boston plan one last heist.")
+        self.casino = make("Casino", "Crime", 1995, "Mob bosses run a Las Vegas gambling empire.")
+        self.up = make("Up", "Animation", 2009, "An old man ties balloons to his house and flies away.")
+        call_command("build_similar_movies", stdout=StringIO())
+        catalog_features.clear()
+
+    def titles(self, movie, **params):
+        resp = self.client.get(f"/api/movies/{movie.pk}/similar/", params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return [item["title"] for item in resp.data["items"]]
+
+    def test_blends_text_genre_and_year(self):
+        # shared "bank robbers" text outweighs Casino's same-year match
+        self.assertEqual(self.titles(self.heat), ["The Town", "Casino", "Up"])
+        self.assertEqual(self.titles(self.heat, limit=1), ["The Town"])
+        with self.assertNumQueries(1):
+            self.client.get(f"/api/movies/{self.heat.pk}/similar/")
+
+    def create(self, title, description):
+        self.client.force_authenticate(self.user)
+        resp = self.client.post(
+            "/api/movies/",
+            {"title": title, "genre": "Animation", "release_year": 1995, "description": description},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        return Movie.objects.get(pk=resp.data["id"])
+
+    def test_created_movie_gets_its_list_from_a_queued_task(self):
+        with patch("movies.tasks.refresh_similar") as refresh:
+            toy_story = self.create("Toy Story", "Toys come to life when their owner leaves the house.")
+        refresh.assert_not_called()  # not in the request
+        self.assertEqual(self.titles(toy_story), [])
+        self.assertEqual(run_due(), (1, 0))
+        self.assertEqual(self.titles(toy_story)[0], "Up")
+
+    def test_refresh_reuses_the_fitted_vocabulary(self):
+        toy_story = self.create("Toy Story", "Toys come to life when their owner leaves the house.")
+        run_due()
+        self.casino.delete()
+        with patch("movies.similarity.fit_tfidf", side_effect=AssertionError("refitted")):
+            sequel = self.create("Toy Story 2", "The toys rescue Woody from a collector.")
+            self.assertEqual(run_due(), (1, 0))
+        titles = self.titles(sequel)
+        self.assertEqual(titles[0], "Toy Story")
+        self.assertNotIn("Casino", titles)
+
+    def test_unknown_movie(self):
+        self.assertEqual(self.client.get("/api/movies/999999/similar/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tfidf_rows_are_unit_length(self):
+        import numpy as np
+        from .similarity import tfidf_matrix
+
+        matrix = tfidf_matrix(["bank robbers bank", "balloons", ""])
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        self.assertEqual(norms.round(5).tolist(), [1.0, 1.0, 0.0])
@@ -0,0 +1,99 @@
+"""
+Refresh-token rotation backed by BlacklistedToken.
+
+Every refresh blacklists the presented token's jti and issues a new pair, so
+a replayed refresh token is refused. Lookups are answered from a per-process
+set of 16-byte jti digests, reloaded from the table's unexpired rows every
+MOVIES_TOKEN_BLACKLIST_RELOAD seconds; the reload only reads, and expired
+rows are deleted by `manage.py prune_blacklisted_tokens`. The INSERT on
+rotation is the authority: its unique constraint rejects a token another
+worker already rotated, even before this process's set has caught up.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import CachedJWTAuthentication
+from .models import BlacklistedToken
+
+
+def jti_digest(jti):
+    return hashlib.blake2b(jti.encode(), digest_size=16).digest()
+
+
+class TokenBlacklist:
+    def __init__(self):
+        self._digests = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def reload_interval(self):
+        return getattr(settings, "MOVIES_TOKEN_BLACKLIST_RELOAD", 300)
+
+    def _reload(self):
+        # expired tokens fail JWT validation before they get here, so skip their rows
+        live = BlacklistedToken.objects.filter(expires_at__gt=timezone.now())
+        jtis = live.values_list("jti", flat=True).iterator(chunk_size=10_000)
+        self._digests = {jti_digest(jti) for jti in jtis}
+        self._loaded_at = time.monotonic()
+
+    def __contains__(self, jti):
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.reload_interval:
+                self._reload()
+            return jti_digest(jti) in self._digests
+
+    def add(self, jti, exp):
+        """Blacklist `jti`; returns False if it already was (here or in another process)."""
+        try:
+            with transaction.atomic():
+                BlacklistedToken.objects.create(
+                    jti=jti, expires_at=datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+                )
+        except IntegrityError:
+            added = False
+        else:
+            added = True
+        with self._lock:
+            self._digests.add(jti_digest(jti))
+        return added
+
+    def clear(self):
+        with self._lock:
+            self._digests = set()
+            self._loaded_at = None
+
+
+token_blacklist = TokenBlacklist()
+
+
+def rotate_refresh_token(raw_token):
+    """
+    Exchange a refresh token for a new (refresh, access) pair.
+
+    Raises InvalidToken for a malformed, expired or already-rotated token and
+    AuthenticationFailed if the user is gone or inactive. The user comes from
+    the principal cache, so a steady-state refresh runs no password hash and
+    usually no SELECT.
+    """
+    try:
+        refresh = RefreshToken(raw_token)
+    except TokenError as exc:
+        raise InvalidToken(str(exc)) from exc
+
+    jti = refresh[api_settings.JTI_CLAIM]
+    if jti in token_blacklist or not token_blacklist.add(jti, refresh["exp"]):
+        raise InvalidToken("Token is blacklisted")
+
+    user = CachedJWTAuthentication().get_user(refresh)
+    rotated = RefreshToken.for_user(user)
+    return rotated, rotated.access_token
@@ -2,22 +2,42 @@ from django.urls import path
 from .views import (
     RegisterView,
     LoginView,
+    TokenRefreshView,
     MovieListCreateView,
     MovieDetailView,
     MovieRatingsView,
     UserRatingsListView,
+    UserRecommendationsView,
+    BulkRatingsView,
+    MovieExportView,
+    MovieBatchView,
+    MovieFacetsView,
+    TopMoviesView,
+    SimilarMoviesView,
+    RatingExportView,
 )
 
 urlpatterns = [
     # Auth
     path("auth/register/", RegisterView.as_view(), name="register"),
     path("auth/login/", LoginView.as_view(), name="login"),
+    path("auth/refresh/", TokenRefreshView.as_view(), name="token-refresh"),
 
     # Movies
     path("movies/", MovieListCreateView.as_view(), name="movie-list-create"),
+    path("movies/export/", MovieExportView.as_view(), name="movie-export"),
+    path("movies/top/", TopMoviesView.as_view(), name="movie-top"),
+    path("movies/batch/", MovieBatchView.as_view(), name="movie-batch"),
+    path("movies/facets/", MovieFacetsView.as_view(), name="movie-facets"),
     path("movies/<int:pk>/", MovieDetailView.as_view(), name="movie-detail"),
     path("movies/<int:pk>/ratings/", MovieRatingsView.as_view(), name="movie-rate"),
+    path("movies/<int:pk>/similar/", SimilarMoviesView.as_view(), name="movie-similar"),
+
+    # Ratings
+    path("ratings/bulk/", BulkRatingsView.as_view(), name="ratings-bulk"),
+    path("ratings/export/", RatingExportView.as_view(), name="rating-export"),
 
     # User ratings
     path("users/<int:user_id>/ratings/", UserRatingsListView.as_view(), name="user-ratings"),
+    path("users/<int:user_id>/recommendations/", UserRecommendationsView.as_view(), name="user-recommendations"),
 ]
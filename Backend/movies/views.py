@@ -1,46 +1,132 @@
-from django.shortcuts import render
-
-# Create your views here.
-from decimal import Decimal
-from django.contrib.auth import authenticate, get_user_model
-from django.db import transaction
+from collections import Counter, defaultdict
+from itertools import islice
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
-from rest_framework import generics, permissions, status, filters
+from django.utils import timezone
+from rest_framework import generics, permissions, status
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.views import APIView
-from rest_framework.pagination import PageNumberPagination
 from rest_framework_simplejwt.tokens import RefreshToken
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse
-from django.db.models import Avg, Count
-from .models import Movie, Rating
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.db.models import Count, F, OuterRef, Subquery
+from .models import Genre, Movie, MovieRanking, Rating, SimilarMovie, Task
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse, OpenApiParameter
-from .serializers import RegisterSerializer, MovieSerializer, RatingSerializer, LoginSerializer, TokenResponseSerializer, MovieListResponseSerializer
+from .cache import VersionedCacheMixin, get_membership_version, get_movie_version
+from .export import EXPORT_FORMATS, export_response
+from .fieldsets import SparseFieldsetMixin
+from .pagination import ContractPagination
+from .parsers import NDJSONParser
+from .recommender import recommend
+from .renderers import FastJSONRenderer
+from .rows import RowListMixin, row_serializer
+from .search import MovieSearchFilter
+from .tokens import rotate_refresh_token
+from .serializers import clean_rating_value, BulkRatingRowSerializer, RegisterSerializer, MovieSerializer, PersonalMovieSerializer, RatingSerializer, TopMovieSerializer, RecommendedMovieSerializer, SimilarMovieSerializer, LoginSerializer, TokenRefreshSerializer, TokenResponseSerializer, MovieListResponseSerializer, MovieBatchRequestSerializer, MovieBatchResponseSerializer
 
 User = get_user_model()
 
-# Custom pagination to match acceptance contract
-class ContractPagination(PageNumberPagination):
-    page_size = 10
-    page_query_param = "page"
-    page_size_query_param = "limit"  # allow ?limit=10
-    max_page_size = 100
-
-    def get_paginated_response(self, data):
-        # Build contract: { items: [...], page: x, limit: y, total: z }
-        page = self.page.number if self.page else 1
-        limit = self.get_page_size(self.request) or self.page_size
-        total = self.page.paginator.count if self.page else 0
-        return Response(
-            {
-                "items": data,
-                "page": page,
-                "limit": int(limit),
-                "total": total,
-            }
-        )
+def filter_movies(qs, params, prefix=""):
+    """
+    Apply the ?genre= / ?min_year= / ?max_year= filters shared by the movie
+    endpoints. `prefix` targets a related movie, e.g. "movie__" on ratings.
+    """
+    genre = params.get("genre")
+    min_year = params.get("min_year")
+    max_year = params.get("max_year")
+
+    if genre:
+        # integer match on genre_id, looked up by case-folded name in the same statement
+        qs = qs.filter(**{f"{prefix}genre": Genre.id_for(genre)})
+    if min_year:
+        try:
+            qs = qs.filter(**{f"{prefix}release_year__gte": int(min_year)})
+        except ValueError:
+            pass
+    if max_year:
+        try:
+            qs = qs.filter(**{f"{prefix}release_year__lte": int(max_year)})
+        except ValueError:
+            pass
+    return qs
+
+# Columns RatingSerializer reads; the joined user only contributes its username
+RATING_LIST_FIELDS = ("id", "movie_id", "rating", "review", "created_at", "updated_at", "user__username")
+
+
+def movie_ratings_queryset(movie_id):
+    return Rating.objects.filter(movie_id=movie_id).select_related("user").only(*RATING_LIST_FIELDS).order_by("-created_at")
+
+
+def user_ratings_queryset(user_id):
+    return Rating.objects.filter(user_id=user_id).select_related("user").only(*RATING_LIST_FIELDS).order_by("-created_at")
+
+
+def fieldset_parameters(serializer_class):
+    available = ", ".join(serializer_class.Meta.fields)
+    return [
+        OpenApiParameter("fields", str, OpenApiParameter.QUERY, description=f"Comma-separated fields to return ({available})"),
+        OpenApiParameter("exclude", str, OpenApiParameter.QUERY, description="Comma-separated fields to leave out"),
+    ]
+
+
+class MyRatingMixin:
+    """
+    Authenticated GETs of MovieSerializer views get `my_rating`, the
+    requesting user's stars, from a correlated subquery on Rating(user, movie)
+    in the same SELECT. Anonymous requests (and their cached pages) are
+    unchanged; ?fields= without my_rating skips the subquery.
+    """
 
+    def is_personal(self):
+        return self.request.method == "GET" and self.request.user.is_authenticated
+
+    def get_serializer_class(self):
+        return PersonalMovieSerializer if self.is_personal() else super().get_serializer_class()
+
+    def annotate_my_rating(self, queryset):
+        if not self.is_personal():
+            return queryset
+        fields = self.get_sparse_fields()
+        if fields is not None and "my_rating" not in fields:
+            return queryset
+        mine = Rating.objects.filter(user=self.request.user, movie=OuterRef("pk")).order_by().values("rating")[:1]
+        return queryset.annotate(my_rating=Subquery(mine))
+
+
+def upsert_rating(user, movie, rating_value, review):
+    """Create or update user's rating of movie; returns (rating, created)."""
+    with transaction.atomic():
+        rating_obj = Rating.objects.select_for_update().filter(user=user, movie=movie).first()
+        created = rating_obj is None
+        if created:
+            # there was no row to lock, so a concurrent first vote can insert
+            # before us; its unique (user, movie) turns ours into an update
+            try:
+                with transaction.atomic():
+                    rating_obj = Rating(user=user, movie=movie, rating=rating_value, review=review)
+                    rating_obj.save()
+                return rating_obj, True
+            except IntegrityError:
+                rating_obj = Rating.objects.select_for_update().get(user=user, movie=movie)
+                created = False
+        # reuse the loaded user/movie so save() and the response don't refetch them
+        rating_obj.user, rating_obj.movie = user, movie
+        rating_obj.rating, rating_obj.review = rating_value, review
+        # Rating.save() applies the old -> new delta to movie's aggregates
+        rating_obj.save()
+    return rating_obj, created
+
+
+def rating_response_data(rating_obj, movie):
+    # aggregates_pending: this vote is queued, so the movie's aggregates don't include it yet
+    return {
+        "rating": RatingSerializer(rating_obj).data,
+        "movie": MovieSerializer(movie).data,
+        "aggregates_pending": getattr(movie, "aggregates_pending", False),
+    }
 
 @extend_schema(
     description="Register a new user. Returns 201 with id/username/email.",
@@ -60,6 +146,10 @@ class RegisterView(generics.CreateAPIView):
         rep = serializer.to_representation(user)
         return Response(rep, status=status.HTTP_201_CREATED, headers=headers)
 
+def token_response_data(refresh, access):
+    return {"access_token": str(access), "refresh_token": str(refresh), "token_type": "bearer"}
+
+
 @extend_schema(
     request=LoginSerializer,
     responses={
@@ -78,11 +168,26 @@ class LoginView(APIView):
 
         # create JWT
         refresh = RefreshToken.for_user(user)
-        access_token = str(refresh.access_token)
-        return Response(
-            {"access_token": access_token, "token_type": "bearer"},
-            status=status.HTTP_200_OK
-        )
+        return Response(token_response_data(refresh, refresh.access_token), status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    request=TokenRefreshSerializer,
+    responses={
+        200: TokenResponseSerializer,
+        401: OpenApiResponse(description="Refresh token invalid, expired or already used."),
+    },
+)
+class TokenRefreshView(APIView):
+    """Trade a refresh token for a new pair; the old refresh token stops working."""
+
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        serializer = TokenRefreshSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh, access = rotate_refresh_token(serializer.validated_data["refresh_token"])
+        return Response(token_response_data(refresh, access), status=status.HTTP_200_OK)
 
 @extend_schema_view(
     get=extend_schema(
@@ -92,16 +197,23 @@ class LoginView(APIView):
             "- `?genre=`: Filter by exact genre\n"
             "- `?min_year=`: Minimum release year\n"
             "- `?max_year=`: Maximum release year\n"
-            "- `?search=`: Search in title or description\n"
+            "- `?search=`: Full-text search in title, description and genre (ranked by relevance)\n"
             "- `?page=` and `?limit=`: Pagination controls\n"
+            "- `?cursor=`: Keyset pagination; pass an empty value for the first page, "
+            "then `next_cursor` from the previous response; not combinable with `?search=` (400)\n"
+            "- `?fields=` / `?exclude=`: Sparse fieldsets, e.g. `?fields=id,title,genre,ratings_avg`; "
+            "only the columns those fields need are selected\n\n"
+            "Authenticated requests also get `my_rating`, the caller's own stars (null if unrated)."
         ),
         parameters=[
             OpenApiParameter("genre", str, OpenApiParameter.QUERY, description="Filter by genre (case-insensitive exact match)"),
             OpenApiParameter("min_year", int, OpenApiParameter.QUERY, description="Filter movies released after or in this year"),
             OpenApiParameter("max_year", int, OpenApiParameter.QUERY, description="Filter movies released before or in this year"),
-            OpenApiParameter("search", str, OpenApiParameter.QUERY, description="Search in title and description"),
+            OpenApiParameter("search", str, OpenApiParameter.QUERY, description="Full-text prefix search in title, description and genre"),
             OpenApiParameter("page", int, OpenApiParameter.QUERY, description="Page number (for pagination)"),
             OpenApiParameter("limit", int, OpenApiParameter.QUERY, description="Page size (number of results per page)"),
+            OpenApiParameter("cursor", str, OpenApiParameter.QUERY, description="Opaque keyset cursor (enables cursor mode)"),
+            *fieldset_parameters(PersonalMovieSerializer),
         ],
         responses={
             200: OpenApiResponse(
@@ -124,33 +236,20 @@ class LoginView(APIView):
         },
     ),
 )
-class MovieListCreateView(generics.ListCreateAPIView):
+class MovieListCreateView(
+    MyRatingMixin, SparseFieldsetMixin, VersionedCacheMixin, RowListMixin, generics.ListCreateAPIView
+):
     serializer_class = MovieSerializer
-    authentication_classes = [JWTAuthentication]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     pagination_class = ContractPagination
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["title", "description", "genre"]
+    cursor_ordering = ("-id",)
+    filter_backends = [MovieSearchFilter]
+    search_fields = ["title", "description", "genre__name"]
 
     def get_queryset(self):
-        qs = Movie.objects.all().order_by("-id")
-        genre = self.request.query_params.get("genre")
-        min_year = self.request.query_params.get("min_year")
-        max_year = self.request.query_params.get("max_year")
-
-        if genre:
-            qs = qs.filter(genre__iexact=genre)
-        if min_year:
-            try:
-                qs = qs.filter(release_year__gte=int(min_year))
-            except ValueError:
-                pass
-        if max_year:
-            try:
-                qs = qs.filter(release_year__lte=int(max_year))
-            except ValueError:
-                pass
-        print(qs)
-        return qs
+        queryset = Movie.objects.select_related("genre").order_by("-id")
+        queryset = self.annotate_my_rating(filter_movies(queryset, self.request.query_params))
+        return self.narrow_queryset(queryset)
 
     def get_permissions(self):
         if self.request.method == "GET":
@@ -158,7 +257,10 @@ class MovieListCreateView(generics.ListCreateAPIView):
         return [permissions.IsAuthenticated()]
 
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        movie = serializer.save(created_by=self.request.user)
+        # its own "similar" list, computed by run_tasks rather than in the request;
+        # other movies pick it up at the next batch build
+        Task.enqueue(Movie.SIMILAR_TASK, [movie.pk])
 
     def create(self, request, *args, **kwargs):
         # Ensure we return 201 and the created object
@@ -167,8 +269,9 @@ class MovieListCreateView(generics.ListCreateAPIView):
 
 @extend_schema(
     description="Retrieve or delete a movie. "
-                "GET returns details (with ratings_avg and ratings_count). "
+                "GET returns details (with ratings_avg and ratings_count, and my_rating when authenticated). "
                 "DELETE removes the movie (only the creator can delete).",
+    parameters=fieldset_parameters(PersonalMovieSerializer),
     responses={
         200: MovieSerializer,
         204: OpenApiResponse(description="Deleted"),
@@ -176,10 +279,14 @@ class MovieListCreateView(generics.ListCreateAPIView):
         404: OpenApiResponse(description="Not found"),
     },
 )
-class MovieDetailView(generics.RetrieveDestroyAPIView):
-    queryset = Movie.objects.all()
+class MovieDetailView(MyRatingMixin, SparseFieldsetMixin, VersionedCacheMixin, generics.RetrieveDestroyAPIView):
     serializer_class = MovieSerializer
-    authentication_classes = [JWTAuthentication]
+
+    def get_queryset(self):
+        return self.narrow_queryset(self.annotate_my_rating(Movie.objects.select_related("genre")))
+
+    def get_cache_version(self):
+        return get_movie_version(self.kwargs["pk"])
 
     def get_permissions(self):
         if self.request.method == "GET":
@@ -192,8 +299,14 @@ class MovieDetailView(generics.RetrieveDestroyAPIView):
         instance.delete()
 
 @extend_schema(
-    description="List ratings for a movie (GET) or add/update your rating (POST).",
+    description=(
+        "List ratings for a movie (GET) or add/update your rating (POST). The POST returns "
+        "`{rating, movie, aggregates_pending}`; `aggregates_pending` is true when the movie's "
+        "aggregates were queued for the worker (deferred or sharded); `movie` then shows the "
+        "aggregates as last stored, without this vote."
+    ),
     request=RatingSerializer,  # only applies to POST
+    parameters=fieldset_parameters(RatingSerializer),
     responses={
         200: RatingSerializer(many=True),  # GET response
         201: RatingSerializer,             # POST created
@@ -201,13 +314,15 @@ class MovieDetailView(generics.RetrieveDestroyAPIView):
         401: OpenApiResponse(description="Authentication required for POST."),
     },
 )
-class MovieRatingsView(generics.ListAPIView):
+class MovieRatingsView(SparseFieldsetMixin, RowListMixin, generics.ListAPIView):
     """
     GET: List ratings for a movie (paginated).
     POST: Add or update a rating for the authenticated user.
     """
     serializer_class = RatingSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     pagination_class = ContractPagination
+    cursor_ordering = ("-created_at", "-id")
 
     def get_permissions(self):
         if self.request.method == "POST":
@@ -215,47 +330,417 @@ class MovieRatingsView(generics.ListAPIView):
         return [permissions.AllowAny()]
 
     def get_queryset(self):
-        pk = self.kwargs.get("pk")
-        return Rating.objects.filter(movie_id=pk).order_by("-created_at")
+        return self.narrow_queryset(movie_ratings_queryset(self.kwargs.get("pk")))
 
     def post(self, request, pk):
-        movie = get_object_or_404(Movie, pk=pk)
-        rating_value = request.data.get("rating")
+        movie = get_object_or_404(Movie.objects.select_related("genre"), pk=pk)
         review = request.data.get("review", "")
-
-        if rating_value is None:
-            return Response({"detail": "rating is required"}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            rating_value = int(rating_value)
-        except (TypeError, ValueError):
-            return Response({"detail": "rating must be an integer between 1 and 5"}, status=status.HTTP_400_BAD_REQUEST)
-        if rating_value < 1 or rating_value > 5:
-            return Response({"detail": "rating must be between 1 and 5"}, status=status.HTTP_400_BAD_REQUEST)
+            rating_value = clean_rating_value(request.data.get("rating"))
+        except ValidationError as exc:
+            return Response({"detail": exc.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        rating_obj, created = upsert_rating(request.user, movie, rating_value, review)
+        status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        return Response(rating_response_data(rating_obj, movie), status=status_code)
+
+
+@extend_schema(
+    summary="Bulk upsert ratings",
+    description=(
+        "Create or update many of the authenticated user's ratings in one request. "
+        "Accepts a JSON array or streamed NDJSON (`application/x-ndjson`) of "
+        "`{movie, rating, review}` objects. Rows are upserted in batches, each touched "
+        "movie's aggregates are updated once, and a per-row result is returned."
+    ),
+    request={"application/json": BulkRatingRowSerializer(many=True), "application/x-ndjson": BulkRatingRowSerializer},
+    responses={
+        200: OpenApiResponse(description="Per-row results with created/updated/error counts."),
+        400: OpenApiResponse(description="Body is not a JSON array / NDJSON."),
+        401: OpenApiResponse(description="Authentication required."),
+    },
+)
+class BulkRatingsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+    batch_size = 500
 
+    def post(self, request):
+        rows = request.data
+        if isinstance(rows, dict) or not hasattr(rows, "__iter__") or isinstance(rows, str):
+            return Response({"detail": "Expected a JSON array or NDJSON body."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        deltas = defaultdict(lambda: [0] * len(Movie.STARS))
+        rows = iter(enumerate(rows))
         with transaction.atomic():
-            rating_obj, created = Rating.objects.update_or_create(
-                user=request.user,
-                movie=movie,
-                defaults={"rating": rating_value, "review": review},
+            while batch := list(islice(rows, self.batch_size)):
+                results.extend(self._upsert_batch(request.user, batch, deltas))
+            Movie.apply_rating_deltas({pk: tuple(delta) for pk, delta in deltas.items()})
+
+        counts = Counter(result["status"] for result in results)
+        return Response(
+            {
+                "results": results,
+                "created": counts["created"],
+                "updated": counts["updated"],
+                "errors": counts["error"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def _upsert_batch(self, user, batch, deltas):
+        results = {}
+        valid = {}  # movie_id -> (index, rating, review); a later row for the same movie wins
+        for index, row in batch:
+            serializer = BulkRatingRowSerializer(data=row)
+            if not serializer.is_valid():
+                results[index] = {"index": index, "status": "error", "errors": serializer.errors}
+                continue
+            data = serializer.validated_data
+            previous = valid.get(data["movie"])
+            if previous:
+                results[previous[0]] = {
+                    "index": previous[0], "movie": data["movie"], "status": "skipped",
+                    "detail": f"superseded by row {index}",
+                }
+            valid[data["movie"]] = (index, data["rating"], data.get("review") or "")
+
+        known = set(Movie.objects.filter(pk__in=valid).values_list("id", flat=True))
+        existing = {
+            rating.movie_id: rating
+            for rating in Rating.objects.filter(user=user, movie_id__in=known).only("id", "movie_id", "rating", "review")
+        }
+        now = timezone.now()
+        to_create, to_update = [], []
+        for movie_id, (index, value, review) in valid.items():
+            if movie_id not in known:
+                results[index] = {"index": index, "movie": movie_id, "status": "error", "errors": {"movie": ["Movie not found."]}}
+                continue
+            rating = existing.get(movie_id)
+            if rating is None:
+                to_create.append(Rating(user=user, movie_id=movie_id, rating=value, review=review))
+                deltas[movie_id][value - 1] += 1
+                results[index] = {"index": index, "movie": movie_id, "status": "created"}
+            else:
+                deltas[movie_id][rating.rating - 1] -= 1
+                deltas[movie_id][value - 1] += 1
+                rating.rating, rating.review, rating.updated_at = value, review, now
+                to_update.append(rating)
+                results[index] = {"index": index, "movie": movie_id, "status": "updated"}
+
+        # bulk paths skip Rating.save(); the caller applies the summed deltas once
+        Rating.objects.bulk_create(to_create, batch_size=self.batch_size)
+        Rating.objects.bulk_update(to_update, ["rating", "review", "updated_at"], batch_size=self.batch_size)
+        return [results[index] for index in sorted(results)]
+
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter("output", str, OpenApiParameter.QUERY, enum=list(EXPORT_FORMATS), description="ndjson (default) or csv"),
+    OpenApiParameter("genre", str, OpenApiParameter.QUERY, description="Filter by genre (case-insensitive exact match)"),
+    OpenApiParameter("min_year", int, OpenApiParameter.QUERY, description="Filter by release year >= value"),
+    OpenApiParameter("max_year", int, OpenApiParameter.QUERY, description="Filter by release year <= value"),
+]
+
+
+class ExportMixin:
+    """
+    Stream a whole table as NDJSON/CSV in constant memory. Combine with
+    APIView and provide `serializer_class`, `filename` and get_queryset().
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            # Recompute movie aggregates
-            movie.recalc_ratings()
+        return export_response(row_serializer(self.serializer_class), self.get_queryset(), output, self.filename)
 
-        rating_data = RatingSerializer(rating_obj).data
-        movie_data = MovieSerializer(movie).data
-        status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
-        return Response({"rating": rating_data, "movie": movie_data}, status=status_code)
+
+@extend_schema(
+    summary="Export movies",
+    description="Stream every movie matching the genre/year filters as NDJSON or CSV, in id order.",
+    parameters=EXPORT_PARAMETERS,
+    responses={200: OpenApiResponse(description="NDJSON lines or CSV rows with the MovieSerializer fields.")},
+)
+class MovieExportView(ExportMixin, APIView):
+    serializer_class = MovieSerializer
+    filename = "movies"
+
+    def get_queryset(self):
+        return filter_movies(Movie.objects.order_by("id"), self.request.query_params)
+
+
+@extend_schema(
+    summary="Export ratings",
+    description=(
+        "Stream every rating as NDJSON or CSV, in id order. Genre/year filters apply to the "
+        "rated movie; `?movie=` and `?user=` narrow to one movie or user."
+    ),
+    parameters=EXPORT_PARAMETERS + [
+        OpenApiParameter("movie", int, OpenApiParameter.QUERY, description="Only ratings of this movie"),
+        OpenApiParameter("user", int, OpenApiParameter.QUERY, description="Only ratings by this user"),
+    ],
+    responses={200: OpenApiResponse(description="NDJSON lines or CSV rows with the RatingSerializer fields.")},
+)
+class RatingExportView(ExportMixin, APIView):
+    serializer_class = RatingSerializer
+    filename = "ratings"
+
+    def get_queryset(self):
+        params = self.request.query_params
+        qs = filter_movies(Rating.objects.order_by("id"), params, prefix="movie__")
+        for name in ("movie", "user"):
+            value = params.get(name)
+            if value:
+                try:
+                    qs = qs.filter(**{f"{name}_id": int(value)})
+                except ValueError:
+                    pass
+        return qs
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Fetch movies by id",
+        description=(
+            "Return the movies for `?ids=1,2,3` in the requested order, with the ids that don't "
+            "exist listed under `missing`. Duplicates are returned once; up to 500 ids per request."
+        ),
+        parameters=[
+            OpenApiParameter("ids", str, OpenApiParameter.QUERY, required=True, description="Comma-separated movie ids"),
+            *fieldset_parameters(MovieSerializer),
+        ],
+        responses={200: MovieBatchResponseSerializer, 400: OpenApiResponse(description="Missing, invalid or too many ids.")},
+    ),
+    post=extend_schema(
+        summary="Fetch movies by id (long lists)",
+        description="Same as GET with the ids in the body, for lists too long for a URL.",
+        request=MovieBatchRequestSerializer,
+        parameters=fieldset_parameters(MovieSerializer),
+        responses={200: MovieBatchResponseSerializer, 400: OpenApiResponse(description="Missing, invalid or too many ids.")},
+    ),
+)
+class MovieBatchView(SparseFieldsetMixin, generics.GenericAPIView):
+    serializer_class = MovieSerializer
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    max_ids = 500
+
+    def get(self, request):
+        ids = [part for part in request.query_params.get("ids", "").split(",") if part.strip()]
+        try:
+            ids = [int(pk) for pk in ids]
+        except ValueError:
+            return Response({"detail": "ids must be comma-separated integers"}, status=status.HTTP_400_BAD_REQUEST)
+        return self.batch_response(ids)
+
+    def post(self, request):
+        serializer = MovieBatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.batch_response(serializer.validated_data["ids"])
+
+    def batch_response(self, ids):
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return Response({"detail": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.max_ids:
+            return Response({"detail": f"at most {self.max_ids} ids per request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # one id__in query, rows formatted like MovieSerializer (see rows.py)
+        rows = row_serializer(MovieSerializer, self.get_sparse_fields())
+        found = {row.id: row for row in rows.values(Movie.objects.filter(id__in=ids), extra=["id"])}
+        return Response({
+            "items": rows.data(found[pk] for pk in ids if pk in found),
+            "missing": [pk for pk in ids if pk not in found],
+        })
+
+
+@extend_schema(
+    summary="Genre and decade facet counts",
+    description=(
+        "Movie counts per genre and per release decade for the movies matching the same "
+        "`?search=`, `?genre=`, `?min_year=` and `?max_year=` as the movie list. Both facets come "
+        "from one GROUP BY over the filtered movies and are cached until a movie is added, removed "
+        "or has its title, description, genre or year changed; votes don't invalidate them."
+    ),
+    parameters=[
+        OpenApiParameter("genre", str, OpenApiParameter.QUERY, description="Filter by genre (case-insensitive exact match)"),
+        OpenApiParameter("min_year", int, OpenApiParameter.QUERY, description="Filter movies released after or in this year"),
+        OpenApiParameter("max_year", int, OpenApiParameter.QUERY, description="Filter movies released before or in this year"),
+        OpenApiParameter("search", str, OpenApiParameter.QUERY, description="Full-text prefix search in title, description and genre"),
+    ],
+    responses={200: OpenApiResponse(description="{total, genres: [{genre, count}], decades: [{decade, count}]}")},
+)
+class MovieFacetsView(VersionedCacheMixin, APIView):
+    permission_classes = [permissions.AllowAny]
+    search_fields = MovieListCreateView.search_fields
+    # counts are the same for everyone, so logged-in sidebars hit the cache too
+    cache_authenticated = True
+
+    def get_cache_version(self):
+        # votes bump the catalog version on every write; counts only change with the movie set
+        return get_membership_version()
+
+    def get(self, request):
+        return self.cached_response(request, lambda: Response(self.facets(request)))
+
+    def facets(self, request):
+        qs = filter_movies(Movie.objects.all(), request.query_params)
+        qs = MovieSearchFilter().filter_queryset(request, qs, self)
+        # one row per (genre, decade) pair; both facets are summed from it
+        groups = (
+            qs.order_by()
+            .values("genre_id", "genre__name", decade=F("release_year") / 10 * 10)
+            .annotate(count=Count("id"))
+        )
+        genres, decades = Counter(), Counter()
+        for group in groups:
+            genres[group["genre__name"]] += group["count"]
+            decades[group["decade"]] += group["count"]
+        return {
+            "total": sum(decades.values()),
+            "genres": [
+                {"genre": name, "count": count}
+                for name, count in sorted(genres.items(), key=lambda item: (-item[1], item[0]))
+            ],
+            "decades": [{"decade": decade, "count": decades[decade]} for decade in sorted(decades)],
+        }
+
+
+@extend_schema(
+    summary="Similar movies",
+    description=(
+        "The movies most similar to this one by description (TF-IDF), genre and release year, "
+        "read from the precomputed SimilarMovie table (`manage.py build_similar_movies`)."
+    ),
+    parameters=[OpenApiParameter("limit", int, OpenApiParameter.QUERY, description="Number of movies (default 10, max 20)")],
+    responses={200: SimilarMovieSerializer(many=True), 404: OpenApiResponse(description="Movie not found.")},
+)
+class SimilarMoviesView(APIView):
+    permission_classes = [permissions.AllowAny]
+    default_limit = 10
+    max_limit = 20
+
+    def get(self, request, pk):
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", self.default_limit)), self.max_limit))
+        except ValueError:
+            return Response({"detail": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        rows = list(
+            SimilarMovie.objects.filter(movie_id=pk).select_related("similar__genre").order_by("-similarity")[:limit]
+        )
+        if not rows:
+            get_object_or_404(Movie.objects.only("id"), pk=pk)
+        movies = []
+        for row in rows:
+            row.similar.similarity = round(row.similarity, 4)
+            movies.append(row.similar)
+        return Response({"items": SimilarMovieSerializer(movies, many=True).data, "limit": limit})
+
+
+@extend_schema(
+    summary="Top-rated movies",
+    description=(
+        "Movies ranked by a Bayesian weighted score: the mean rating shrunk towards the catalog "
+        "mean by `min_votes` phantom votes, so titles with a handful of votes don't top the chart. "
+        "Served from the maintained MovieRanking index; unrated movies are not listed."
+    ),
+    parameters=[
+        OpenApiParameter("genre", str, OpenApiParameter.QUERY, description="Filter by genre (case-insensitive exact match)"),
+        OpenApiParameter("decade", int, OpenApiParameter.QUERY, description="Filter by decade, e.g. 1990"),
+        OpenApiParameter("limit", int, OpenApiParameter.QUERY, description="Number of movies (default 10, max 100)"),
+    ],
+    responses={200: TopMovieSerializer(many=True), 400: OpenApiResponse(description="Invalid decade or limit.")},
+)
+class TopMoviesView(APIView):
+    permission_classes = [permissions.AllowAny]
+    default_limit = 10
+    max_limit = 100
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            limit = min(int(params.get("limit", self.default_limit)), self.max_limit)
+            decade = params.get("decade")
+            decade = int(decade.rstrip("s")) // 10 * 10 if decade else None
+        except ValueError:
+            return Response({"detail": "decade and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"detail": "limit must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = MovieRanking.objects.select_related("movie__genre").order_by("-score", "movie")
+        genre = params.get("genre")
+        if genre:
+            qs = qs.filter(genre=Genre.id_for(genre))
+        if decade is not None:
+            qs = qs.filter(decade=decade)
+        movies = [ranking.movie for ranking in qs[:limit]]
+        return Response({
+            "items": TopMovieSerializer(movies, many=True).data,
+            "limit": limit,
+            "min_votes": MovieRanking.min_votes(),
+        })
 
 
 @extend_schema(
     description="List ratings by a user (paginated).",
+    parameters=fieldset_parameters(RatingSerializer),
     responses={200: RatingSerializer(many=True)},
 )
-class UserRatingsListView(generics.ListAPIView):
+class UserRatingsListView(SparseFieldsetMixin, RowListMixin, generics.ListAPIView):
     serializer_class = RatingSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     pagination_class = ContractPagination
+    cursor_ordering = ("-created_at", "-id")
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
-        user_id = self.kwargs.get("user_id")
-        return Rating.objects.filter(user_id=user_id).order_by("-created_at")
+        return self.narrow_queryset(user_ratings_queryset(self.kwargs.get("user_id")))
+
+
+@extend_schema(
+    summary="Recommendations for a user",
+    description=(
+        "Movies the user hasn't rated, scored from their recent ratings and the item-item "
+        "neighbors precomputed by `manage.py build_recommendations`. Remaining slots are "
+        "filled from the top-rated leaderboard with `score: null`."
+    ),
+    parameters=[OpenApiParameter("limit", int, OpenApiParameter.QUERY, description="Number of movies (default 20, max 100)")],
+    responses={200: RecommendedMovieSerializer(many=True), 400: OpenApiResponse(description="Invalid limit.")},
+)
+class UserRecommendationsView(APIView):
+    permission_classes = [permissions.AllowAny]
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, user_id):
+        try:
+            limit = min(int(request.query_params.get("limit", self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response({"detail": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"detail": "limit must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        scored = dict(recommend(user_id, limit))
+        movies = Movie.objects.select_related("genre").in_bulk(scored)
+        picked = [movies[pk] for pk in scored if pk in movies]
+        for movie in picked:
+            movie.recommendation_score = round(scored[movie.pk], 4)
+
+        if len(picked) < limit:
+            rated = Rating.objects.filter(user_id=user_id).values("movie_id")
+            fill = (
+                MovieRanking.objects.select_related("movie__genre")
+                .exclude(movie_id__in=rated)
+                .exclude(movie_id__in=scored)
+                .order_by("-score", "movie")[: limit - len(picked)]
+            )
+            for ranking in fill:
+                ranking.movie.recommendation_score = None
+                picked.append(ranking.movie)
+
+        return Response({"items": RecommendedMovieSerializer(picked, many=True).data, "limit": limit})
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -99,6 +100,34 @@ DATABASES = {
 }
 
 
+# Cache
+# CACHE_BACKEND picks the store behind response caching: locmem (default),
+# file (CACHE_LOCATION directory) or redis (CACHE_LOCATION URL).
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -144,7 +173,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",  # <--- added
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "movies.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -153,6 +182,45 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 }
 
+# Seconds a cursor-mode `total` stays cached after the first page counts it
+CONTRACT_PAGINATION_TOTAL_TTL = 60
+
+# Anonymous movie list/detail responses (see movies/cache.py)
+MOVIES_RESPONSE_CACHE_ALIAS = "default"
+MOVIES_RESPONSE_CACHE_TIMEOUT = 300
+
+# Token user -> User instance (see movies/principals.py). The TTL bounds how
+# long another worker may keep serving a user that was changed or disabled.
+# Set the alias (e.g. "default" with CACHE_BACKEND=redis) to share misses.
+MOVIES_PRINCIPAL_CACHE_SIZE = 10_000
+MOVIES_PRINCIPAL_CACHE_TTL = 60
+MOVIES_PRINCIPAL_CACHE_ALIAS = None
+
+# Phantom votes at the catalog mean added to every movie's score on
+# /api/movies/top/; titles need about this many ratings to rank on their own
+MOVIES_TOP_MIN_VOTES = 10
+
+# Seconds between reloads of the in-memory refresh-token blacklist (movies/tokens.py)
+MOVIES_TOKEN_BLACKLIST_RELOAD = 300
+
+# Seconds the run_tasks worker keeps its fitted description TF-IDF before
+# refitting it on the whole catalog; new movies' "similar" lists are
+# computed against it in between (movies/similarity.py)
+MOVIES_SIMILAR_REFIT = 3600
+
+# With MOVIES_DEFER_AGGREGATES=1, rating writes queue a per-movie aggregate
+# recompute for `manage.py run_tasks` instead of updating the Movie row in
+# the request (movies/tasks.py). A movie's pending recomputes coalesce; the
+# delay (seconds) lets a burst of votes share one. Off by default: without a
+# worker running, aggregates would never update.
+MOVIES_DEFER_AGGREGATES = os.environ.get("MOVIES_DEFER_AGGREGATES") == "1"
+MOVIES_AGGREGATE_DELAY = 1.0
+
+# Spread each movie's rating counter writes over this many MovieRatingShard
+# rows (0 = update the Movie row directly). Shards are folded into Movie by
+# queued tasks, so this also needs `manage.py run_tasks`.
+MOVIES_RATING_SHARDS = int(os.environ.get("MOVIES_RATING_SHARDS", "0"))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "My API",
     "VERSION": "1.0.0",
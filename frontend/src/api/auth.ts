@@ -2,10 +2,10 @@ import API from "./axios";
 
 export async function login(email: string, password: string) {
     const response = await API.post("/auth/login/", { email, password });
-    const { access_token } = response.data;
+    const { access_token, refresh_token } = response.data;
 
-    // Save token to localStorage
-    localStorage.setItem("authTokens", JSON.stringify({ access: access_token }));
+    // Save tokens to localStorage; the refresh token renews access without the password
+    localStorage.setItem("authTokens", JSON.stringify({ access: access_token, refresh: refresh_token }));
 
 
     return response.data;
@@ -30,4 +30,46 @@ API.interceptors.request.use(
     }
 );
 
+// Single in-flight refresh shared by every request that hit a 401 at once;
+// the server rotates refresh tokens, so two parallel refreshes would race.
+let refreshing: Promise<string> | null = null;
+
+function refreshAccessToken(): Promise<string> {
+    if (!refreshing) {
+        const tokens = JSON.parse(localStorage.getItem('authTokens') || '{}');
+        refreshing = axios
+            .post(`${API.defaults.baseURL}/auth/refresh/`, { refresh_token: tokens.refresh })
+            .then((response) => {
+                const { access_token, refresh_token } = response.data;
+                localStorage.setItem('authTokens', JSON.stringify({ access: access_token, refresh: refresh_token }));
+                return access_token;
+            })
+            .finally(() => {
+                refreshing = null;
+            });
+    }
+    return refreshing;
+}
+
+// On an expired access token, refresh once and replay the request
+API.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        const tokens = JSON.parse(localStorage.getItem('authTokens') || '{}');
+        if (error.response?.status !== 401 || !tokens.refresh || original._retried) {
+            return Promise.reject(error);
+        }
+        original._retried = true;
+        try {
+            const accessToken = await refreshAccessToken();
+            original.headers.Authorization = `Bearer ${accessToken}`;
+            return API(original);
+        } catch (refreshError) {
+            localStorage.removeItem('authTokens');
+            return Promise.reject(refreshError);
+        }
+    }
+);
+
 export default API;
\ No newline at end of file
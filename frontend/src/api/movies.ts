@@ -17,6 +17,14 @@ export async function fetchMovies(filters?: MovieFilters) {
     return res.data;
 }
 
+// Genre / decade counts for the filter sidebar, for the same filters as fetchMovies
+export async function fetchMovieFacets(filters?: Omit<MovieFilters, "page" | "limit">) {
+    const res = await API.get("/movies/facets/", {
+        params: filters
+    });
+    return res.data;
+}
+
 export async function fetchMovieDetails(id: number) {
     const response = await API.get(`/movies/${id}/`);
     return response.data;
@@ -50,4 +58,14 @@ export async function fetchUserRatings(userId: number, page: number = 1, limit:
         params: { page, limit }
     });
     return response.data;
-}
\ No newline at end of file
+}
+
+// Movies by id in one request (e.g. titles for a user's ratings); long lists go in a POST body
+export async function fetchMoviesByIds(ids: number[], fields?: string[]) {
+    const params = fields ? { fields: fields.join(",") } : {};
+    const query = ids.join(",");
+    const response = query.length > 1500
+        ? await API.post("/movies/batch/", { ids }, { params })
+        : await API.get("/movies/batch/", { params: { ...params, ids: query } });
+    return response.data;
+}
@@ -8,4 +8,6 @@ export interface Movie {
     ratings_avg: string;   
     ratings_count: number;
     created_at: string;
+    // only present when the request is authenticated
+    my_rating?: number | null;
 }